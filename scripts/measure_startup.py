@@ -0,0 +1,116 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Measures how long it takes to enable the addons of the working tree, compared with the addons of a git revision.
+# Run from the repository root:
+#   blender -b --factory-startup --python scripts/measure_startup.py -- [--runs N] [--templates DIR] [--baseline REV]
+# Pass a revision from before the template catalog was loaded lazily as --baseline to measure the gain of the lazy loading.
+
+import argparse
+import compileall
+import importlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+import bpy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDONS = ["tmtktools", "tmtk_templates"]
+ADDON_PATHS = ["tmtktools.py", "tmtk_templates"]
+
+def parseArgs():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Measure addon enable time")
+    parser.add_argument("--runs", type=int, default=10, help="Number of measurements per version")
+    parser.add_argument("--templates", default=None, help="Template directory to scan (defaults to the one shipped with the addon)")
+    parser.add_argument("--baseline", default="HEAD", help="Git revision to compare the working tree with")
+    return parser.parse_args(argv)
+
+def exportWorkingTree(directory):
+    for path in ADDON_PATHS:
+        source = os.path.join(REPO_DIR, path)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(directory, path), ignore = shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy(source, directory)
+
+def exportRevision(revision, directory):
+    archive = subprocess.run(["git", "archive", revision] + ADDON_PATHS, cwd = REPO_DIR, capture_output = True, check = True).stdout
+    with tarfile.open(fileobj = io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+def linkTemplates(directory, templates):
+    # both versions scan the templates inside the addon folder, older ones already at import
+    if templates is not None:
+        target = os.path.join(directory, "tmtk_templates", "templates")
+        if os.path.lexists(target):
+            shutil.rmtree(target)
+        os.symlink(os.path.abspath(templates), target)
+
+def purgeModules():
+    for name in list(sys.modules.keys()):
+        if name.split(".")[0] in ADDONS:
+            del sys.modules[name]
+
+def enableAddons(directory):
+    # equivalent to what addon_utils.enable does: import the module, then call register()
+    sys.path.insert(0, directory)
+    try:
+        start = time.perf_counter()
+        modules = [importlib.import_module(name) for name in ADDONS]
+        for mod in modules:
+            mod.register()
+        enabled = time.perf_counter() - start
+
+        # cost of drawing the template menus for the first time, only for versions which defer it
+        templateModule = sys.modules["tmtk_templates.tmtk_templates"]
+        firstOpen = None
+        if hasattr(templateModule, "get_template_folders"):
+            start = time.perf_counter()
+            for folder in templateModule.get_template_folders():
+                templateModule.get_templates(folder)
+            modules[1].get_icon_id()
+            firstOpen = time.perf_counter() - start
+
+        for mod in reversed(modules):
+            mod.unregister()
+    finally:
+        purgeModules()
+        sys.path.remove(directory)
+    return enabled, firstOpen
+
+def main():
+    args = parseArgs()
+    print("Blender {}, {} runs per version".format(bpy.app.version_string, args.runs))
+    with tempfile.TemporaryDirectory() as tempdir:
+        versions = [("baseline {}".format(args.baseline), os.path.join(tempdir, "baseline")), ("working tree", os.path.join(tempdir, "current"))]
+        for _, directory in versions:
+            os.mkdir(directory)
+        exportRevision(args.baseline, versions[0][1])
+        exportWorkingTree(versions[1][1])
+        for label, directory in versions:
+            linkTemplates(directory, args.templates)
+            # installed addons have their bytecode cached, Blender does not write it while measuring
+            compileall.compile_dir(directory, quiet = 1)
+            results = [enableAddons(directory) for _ in range(args.runs)]
+            enabled = sorted(r[0] for r in results)
+            firstOpen = sorted(r[1] for r in results if r[1] is not None)
+            openInfo = " | first menu draw {:8.2f} ms (median)".format(1000 * firstOpen[len(firstOpen) // 2]) if firstOpen else ""
+            print("{:>24}: enable {:8.2f} ms (median), {:8.2f} ms (min){}".format(
+                label, 1000 * enabled[len(enabled) // 2], 1000 * enabled[0], openInfo))
+
+if __name__ == "__main__":
+    main()
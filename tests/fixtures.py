@@ -0,0 +1,149 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Procedurally built scenes for the tests which run inside Blender (blender -b).
+
+import bpy
+import contextlib
+import math
+import os
+import random
+import time
+
+import tmtktools
+
+# Scale all time budgets, e.g. TMTK_TEST_BUDGET_SCALE=3 on slow machines
+BUDGET_SCALE = float(os.environ.get("TMTK_TEST_BUDGET_SCALE", "1.0"))
+ADDONS_REGISTERED = False
+
+def registerAddons():
+    # resetScene keeps classes which were registered this way, so this is only needed once per Blender session
+    global ADDONS_REGISTERED
+    if ADDONS_REGISTERED:
+        return
+    import tmtk_templates
+    tmtktools.register()
+    tmtk_templates.register()
+    ADDONS_REGISTERED = True
+
+@contextlib.contextmanager
+def budget(testCase, seconds, megabytes):
+    # Fails the test if the block takes longer than seconds or raises the peak RSS of Blender by more than megabytes
+    peakBefore = tmtktools.getPeakMemory()
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    testCase.assertLessEqual(elapsed, seconds * BUDGET_SCALE, "time budget exceeded: {:.2f}s > {:.2f}s".format(elapsed, seconds * BUDGET_SCALE))
+    peakAfter = tmtktools.getPeakMemory()
+    if peakBefore is not None and peakAfter is not None:
+        growth = (peakAfter - peakBefore) / (1024 * 1024)
+        testCase.assertLessEqual(growth, megabytes, "memory budget exceeded: {:.0f} MB > {} MB".format(growth, megabytes))
+
+def selectOnly(objects, active = None):
+    viewLayer = bpy.context.view_layer
+    for o in viewLayer.objects:
+        o.select_set(False)
+    for o in objects:
+        o.select_set(True)
+    viewLayer.objects.active = active if active is not None else (objects[0] if objects else None)
+
+def resetScene():
+    bpy.ops.wm.read_homefile(use_empty = True, use_factory_startup = True)
+    return bpy.context.scene
+
+def linkObject(obj):
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+def buildColumnMesh(name, segments = 8, rings = 4, height = 2.0, radius = 0.25):
+    # Open cylinder with UVs and two materials (upper and lower half)
+    verts = []
+    for r in range(rings + 1):
+        z = height * r / rings
+        for s in range(segments):
+            a = 2.0 * math.pi * s / segments
+            verts.append((radius * math.cos(a), radius * math.sin(a), z))
+    faces = []
+    for r in range(rings):
+        for s in range(segments):
+            a = r * segments + s
+            b = r * segments + (s + 1) % segments
+            faces.append((a, b, b + segments, a + segments))
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    uvLayer = mesh.uv_layers.new(name = "UVMap")
+    for poly in mesh.polygons:
+        for loopIndex in poly.loop_indices:
+            co = verts[mesh.loops[loopIndex].vertex_index]
+            uvLayer.data[loopIndex].uv = ((math.atan2(co[1], co[0]) / (2.0 * math.pi)) % 1.0, co[2] / height)
+    for matName in (name + "_Upper", name + "_Lower"):
+        mesh.materials.append(bpy.data.materials.new(matName))
+    for poly in mesh.polygons:
+        poly.material_index = 0 if poly.center.z > height / 2.0 else 1
+    mesh.update()
+    return mesh
+
+def buildWeightedGrid(name = "Grid", size = 50, groups = 6, seed = 1):
+    # Plane of size x size vertices with 1 to groups random, unnormalized weights per vertex
+    verts = [(x / size, y / size, 0.0) for y in range(size) for x in range(size)]
+    faces = [(y * size + x, y * size + x + 1, (y + 1) * size + x + 1, (y + 1) * size + x)
+             for y in range(size - 1) for x in range(size - 1)]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.materials.append(bpy.data.materials.new(name + "_Material"))
+    obj = linkObject(bpy.data.objects.new(name, mesh))
+    vertexGroups = [obj.vertex_groups.new(name = "Bone{}".format(i)) for i in range(groups)]
+    rng = random.Random(seed)
+    for v in mesh.vertices:
+        for group in rng.sample(vertexGroups, rng.randint(1, groups)):
+            group.add([v.index], rng.uniform(0.01, 1.0), 'REPLACE')
+    return obj
+
+def buildRiggedColumn(name = "Column", frames = 10):
+    # Column skinned to a two bone armature with a keyframe on every frame, parented with an armature modifier
+    scene = resetScene()
+    obj = linkObject(bpy.data.objects.new(name, buildColumnMesh(name)))
+
+    armaData = bpy.data.armatures.new(name + "Rig")
+    arma = linkObject(bpy.data.objects.new(name + "Rig", armaData))
+    bpy.context.view_layer.objects.active = arma
+    bpy.ops.object.mode_set(mode = "EDIT")
+    root = armaData.edit_bones.new("Root")
+    root.head, root.tail = (0.0, 0.0, 0.0), (0.0, 0.0, 1.0)
+    tip = armaData.edit_bones.new("Tip")
+    tip.head, tip.tail = (0.0, 0.0, 1.0), (0.0, 0.0, 2.0)
+    tip.parent = root
+    tip.use_connect = True
+    bpy.ops.object.mode_set(mode = "OBJECT")
+
+    rootGroup = obj.vertex_groups.new(name = "Root")
+    tipGroup = obj.vertex_groups.new(name = "Tip")
+    for v in obj.data.vertices:
+        t = min(max(v.co.z / 2.0, 0.0), 1.0)
+        rootGroup.add([v.index], 1.0 - t, 'REPLACE')
+        tipGroup.add([v.index], t, 'REPLACE')
+    mod = obj.modifiers.new("Armature", "ARMATURE")
+    mod.object = arma
+    obj.parent = arma
+
+    arma.animation_data_create()
+    arma.animation_data.action = bpy.data.actions.new(name + "Action")
+    tipBone = arma.pose.bones["Tip"]
+    rootBone = arma.pose.bones["Root"]
+    tipBone.rotation_mode = "XYZ"
+    for frame in range(1, frames + 1):
+        phase = 2.0 * math.pi * (frame - 1) / frames
+        tipBone.rotation_euler = (0.5 * math.sin(phase), 0.0, 0.0)
+        tipBone.keyframe_insert("rotation_euler", frame = frame)
+        rootBone.location = (0.0, 0.1 * math.sin(phase), 0.0)
+        rootBone.keyframe_insert("location", frame = frame)
+    scene.frame_start, scene.frame_end = 1, frames
+    scene.frame_set(1)
+    return obj, arma
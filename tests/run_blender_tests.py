@@ -0,0 +1,30 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Runs all tests of this folder inside Blender. Run from the repository root:
+#   blender -b --factory-startup --python tests/run_blender_tests.py
+# Arguments after -- are passed to unittest, e.g. -- -v -k Exporter
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, TESTS_DIR)
+
+import fixtures
+
+if __name__ == "__main__":
+    fixtures.registerAddons()
+    extra = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    argv = [sys.argv[0], "discover", "-s", TESTS_DIR, "-t", TESTS_DIR, "-p", "test_*.py"] + extra
+    result = unittest.main(module = None, argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,76 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for TMTK_OT_AnimationFixer. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_animation_fixer.py
+
+import os
+import sys
+import unittest
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+PLACES = 4
+
+def getLocationKeys(arma):
+    return [k.co[1] for fc in arma.animation_data.action.fcurves if "location" in fc.data_path for k in fc.keyframe_points]
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestAnimationFixer(unittest.TestCase):
+    def test_fix_and_revert(self):
+        _, arma = fixtures.buildRiggedColumn()
+        fixtures.selectOnly([arma])
+        lengths = {b.name: b.length for b in arma.data.bones}
+        rest = {b.name: [c for row in b.matrix_local for c in row] for b in arma.data.bones}
+        locations = getLocationKeys(arma)
+        with fixtures.budget(self, 2.0, 64):
+            result = bpy.ops.tmtk.tmtkanimationfixer()
+        self.assertEqual(result, {'FINISHED'})
+        self.assertTrue(arma[tmtktools.FIXEDPROP])
+        scale = 100.0 * bpy.context.scene.unit_settings.scale_length
+        for name, length in lengths.items():
+            self.assertAlmostEqual(arma.data.bones[name].length, scale * length, places = 2)
+        for before, after in zip(locations, getLocationKeys(arma)):
+            self.assertAlmostEqual(after, scale * before, places = 3)
+
+        # the exporter reverts the fix the same way
+        tmtktools.TMTK_OT_AnimationFixer.scaleLocationFcurves(arma.animation_data.action, forward = False)
+        tmtktools.TMTK_OT_AnimationFixer.prepareArmatureForExport(arma, forward = False)
+        for name, matrix in rest.items():
+            for a, b in zip(matrix, [c for row in arma.data.bones[name].matrix_local for c in row]):
+                self.assertAlmostEqual(a, b, places = PLACES)
+        for before, after in zip(locations, getLocationKeys(arma)):
+            self.assertAlmostEqual(before, after, places = PLACES)
+
+    def test_cancelled_without_animation(self):
+        _, arma = fixtures.buildRiggedColumn()
+        arma.animation_data.action = None
+        fixtures.selectOnly([arma])
+        self.assertEqual(bpy.ops.tmtk.tmtkanimationfixer(), {'CANCELLED'})
+        self.assertNotIn(tmtktools.FIXEDPROP, arma)
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,276 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for TMTK_OT_Exporter. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_exporter.py
+
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+PLACES = 4
+
+def getRestPose(arma):
+    return {b.name: [c for row in b.matrix_local for c in row] for b in arma.data.bones}
+
+def getKeyframes(arma):
+    return [(fc.data_path, fc.array_index, [tuple(k.co) + tuple(k.handle_left) + tuple(k.handle_right) for k in fc.keyframe_points],
+             [(k.interpolation, k.handle_left_type, k.handle_right_type) for k in fc.keyframe_points])
+            for fc in arma.animation_data.action.fcurves]
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tempdir.name, name)
+
+    def assertRestPoseEqual(self, expected, actual):
+        self.assertEqual(sorted(expected.keys()), sorted(actual.keys()))
+        for name in expected:
+            for a, b in zip(expected[name], actual[name]):
+                self.assertAlmostEqual(a, b, places = PLACES, msg = "rest pose of {} differs".format(name))
+
+    def assertKeyframesEqual(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for (path, index, keys, types), (actualPath, actualIndex, actualKeys, actualTypes) in zip(expected, actual):
+            self.assertEqual((path, index, types), (actualPath, actualIndex, actualTypes))
+            self.assertEqual(len(keys), len(actualKeys))
+            for key, actualKey in zip(keys, actualKeys):
+                for a, b in zip(key, actualKey):
+                    self.assertAlmostEqual(a, b, places = PLACES, msg = "keyframe of {}[{}] differs".format(path, index))
+
+    def test_armature_restored_after_export(self):
+        _, arma = fixtures.buildRiggedColumn()
+        rest, keys = getRestPose(arma), getKeyframes(arma)
+        filepath = self.path("Column.fbx")
+        with fixtures.budget(self, 10.0, 256):
+            bpy.ops.tmtk.tmtkexporter(filepath = filepath)
+        self.assertTrue(os.path.isfile(filepath))
+        self.assertRestPoseEqual(rest, getRestPose(arma))
+        self.assertKeyframesEqual(keys, getKeyframes(arma))
+        self.assertNotIn(tmtktools.FIXEDPROP, arma)
+
+    def test_background_export(self):
+        # without a window the operator waits for the worker instead of running modal
+        _, arma = fixtures.buildRiggedColumn(frames = 40)
+        rest, keys = getRestPose(arma), getKeyframes(arma)
+        bpy.ops.object.mode_set(mode = "EDIT")
+        editBones = {b.name: (tuple(b.head), tuple(b.tail), b.roll) for b in arma.data.edit_bones}
+        bpy.ops.object.mode_set(mode = "OBJECT")
+        filepath = self.path("Column.fbx")
+        with bpy.context.temp_override(window = None):
+            self.assertIsNone(bpy.context.window)
+            result = bpy.ops.tmtk.tmtkexporter(filepath = filepath, background = True, reduceKeyframes = True, keyframeTolerance = 0.01)
+        self.assertEqual(result, {'FINISHED'})
+        self.assertTrue(os.path.isfile(filepath))
+        self.assertRestPoseEqual(rest, getRestPose(arma))
+        self.assertKeyframesEqual(keys, getKeyframes(arma))
+        self.assertNotIn(tmtktools.FIXEDPROP, arma)
+        bpy.ops.object.mode_set(mode = "EDIT")
+        self.assertEqual({b.name: (tuple(b.head), tuple(b.tail), b.roll) for b in arma.data.edit_bones}, editBones)
+        bpy.ops.object.mode_set(mode = "OBJECT")
+        fixtures.resetScene()
+        bpy.ops.import_scene.fbx(filepath = filepath)
+        self.assertEqual(sorted(o.type for o in bpy.context.scene.objects), ["ARMATURE", "MESH"])
+
+    def test_keyframe_reduction_restored(self):
+        _, arma = fixtures.buildRiggedColumn(frames = 40)
+        keys = getKeyframes(arma)
+        bpy.ops.tmtk.tmtkexporter(filepath = self.path("Column.fbx"), reduceKeyframes = True, keyframeTolerance = 0.01)
+        self.assertKeyframesEqual(keys, getKeyframes(arma))
+
+    def test_keyframe_reduction_checks_every_frame(self):
+        # the middle key lies on the line between its neighbours, but the eased curve does not
+        fixtures.resetScene()
+        obj = fixtures.linkObject(bpy.data.objects.new("Eased", None))
+        for frame, value in ((0, 0.0), (12, 5.0), (24, 10.0)):
+            obj.location.x = value
+            obj.keyframe_insert("location", index = 0, frame = frame)
+        fcurve = obj.animation_data.action.fcurves[0]
+        for key in fcurve.keyframe_points:
+            key.easing = "EASE_IN_OUT"
+        fcurve.update()
+        expected = [fcurve.evaluate(frame) for frame in range(25)]
+        tmtktools.reduceActionKeyframes(obj.animation_data.action, 0.01)
+        for frame in range(25):
+            self.assertAlmostEqual(fcurve.evaluate(frame), expected[frame], delta = 0.01, msg = "frame {}".format(frame))
+
+    def test_fixed_armature_keeps_tolerance(self):
+        # the Animation Fixer scales the locations, the tolerance has to follow
+        kept = []
+        reduce = tmtktools.reduceKeyframeValues
+        def recordingReduce(*args):
+            keep = reduce(*args)
+            kept.append(int(keep.sum()))
+            return keep
+        tmtktools.reduceKeyframeValues = recordingReduce
+        try:
+            counts = []
+            for fixed in (False, True):
+                _, arma = fixtures.buildRiggedColumn(frames = 40)
+                if fixed:
+                    bpy.ops.tmtk.tmtkanimationfixer()
+                del kept[:]
+                bpy.ops.tmtk.tmtkexporter(filepath = self.path("Column.fbx"), leanWriter = True, reduceKeyframes = True, keyframeTolerance = 0.01)
+                counts.append(list(kept))
+        finally:
+            tmtktools.reduceKeyframeValues = reduce
+        self.assertEqual(counts[0], counts[1])
+
+    def test_failed_export_restores_armature(self):
+        _, arma = fixtures.buildRiggedColumn(frames = 40)
+        keys = getKeyframes(arma)
+        head = arma.data.bones["Tip"].head_local.copy()
+        with self.assertRaises(RuntimeError):
+            bpy.ops.tmtk.tmtkexporter(filepath = self.path(os.path.join("missing", "Column.fbx")), reduceKeyframes = True)
+        self.assertKeyframesEqual(keys, getKeyframes(arma))
+        self.assertAlmostEqual((arma.data.bones["Tip"].head_local - head).length, 0.0, places = 5)
+
+    def test_keyframe_reduction_shrinks_lean_export(self):
+        fixtures.buildRiggedColumn(frames = 40)
+        full, reduced = self.path("Full.fbx"), self.path("Reduced.fbx")
+        bpy.ops.tmtk.tmtkexporter(filepath = full, leanWriter = True)
+        bpy.ops.tmtk.tmtkexporter(filepath = reduced, leanWriter = True, reduceKeyframes = True, keyframeTolerance = 0.01)
+        self.assertLess(os.path.getsize(reduced), os.path.getsize(full))
+
+    def test_incremental_skips_unchanged(self):
+        obj, _ = fixtures.buildRiggedColumn()
+        filepath = self.path("Column.fbx")
+        bpy.ops.tmtk.tmtkexporter(filepath = filepath, incremental = True)
+        self.assertTrue(os.path.isfile(tmtktools.getManifestPath(filepath)))
+        os.utime(filepath, ns = (1, 1))
+        bpy.ops.tmtk.tmtkexporter(filepath = filepath, incremental = True)
+        self.assertEqual(os.stat(filepath).st_mtime_ns, 1)
+        obj.data.vertices[0].co.x += 0.1
+        obj.data.update()
+        bpy.ops.tmtk.tmtkexporter(filepath = filepath, incremental = True)
+        self.assertNotEqual(os.stat(filepath).st_mtime_ns, 1)
+
+    def test_hash_ignores_current_frame(self):
+        obj, _ = fixtures.buildRiggedColumn()
+        scene = bpy.context.scene
+        scene.frame_set(1)
+        before = tmtktools.hashExportObject(obj, bpy.context.evaluated_depsgraph_get())
+        scene.frame_set(4)
+        self.assertEqual(tmtktools.hashExportObject(obj, bpy.context.evaluated_depsgraph_get()), before)
+        obj.modifiers["Armature"].use_vertex_groups = False
+        self.assertNotEqual(tmtktools.hashExportObject(obj, bpy.context.evaluated_depsgraph_get()), before)
+
+    def test_hash_covers_normals_and_attributes(self):
+        obj, _ = fixtures.buildRiggedColumn()
+        mesh = obj.data
+        for polygon in mesh.polygons:
+            polygon.use_smooth = True
+        def getHash():
+            mesh.update()
+            return tmtktools.hashExportObject(obj, bpy.context.evaluated_depsgraph_get())
+        hashes = [getHash()]
+        mesh.edges[0].use_edge_sharp = True
+        hashes.append(getHash())
+        mesh.normals_split_custom_set_from_vertices([(0.0, 0.0, 1.0)] * len(mesh.vertices))
+        hashes.append(getHash())
+        colors = mesh.color_attributes.new("Col", "FLOAT_COLOR", "POINT")
+        hashes.append(getHash())
+        colors.data[0].color = (1.0, 0.0, 0.0, 1.0)
+        hashes.append(getHash())
+        obj.shape_key_add(name = "Basis")
+        hashes.append(getHash())
+        mesh.shape_keys.key_blocks["Basis"].data[0].co.x += 0.1
+        hashes.append(getHash())
+        self.assertEqual(len(set(hashes)), len(hashes))
+
+    def test_split_items(self):
+        fixtures.resetScene()
+        for name in ("Left", "Right"):
+            for level in range(2):
+                fixtures.linkObject(bpy.data.objects.new("{}_L{}".format(name, level), fixtures.buildColumnMesh(name)))
+        with fixtures.budget(self, 10.0, 256):
+            bpy.ops.tmtk.tmtkexporter(filepath = self.path("unused.fbx"), splitItems = True)
+        self.assertEqual(sorted(f for f in os.listdir(self.tempdir.name) if f.endswith(".fbx")), ["Left.fbx", "Right.fbx"])
+
+    def test_split_items_include_hidden_lods(self):
+        fixtures.resetScene()
+        for level in range(2):
+            fixtures.linkObject(bpy.data.objects.new("Column_L{}".format(level), fixtures.buildColumnMesh("Column")))
+        lod = bpy.data.objects["Column_L1"]
+        lod.hide_set(True)
+        lod.hide_select = True
+        bpy.ops.tmtk.tmtkexporter(filepath = self.path("unused.fbx"), splitItems = True, onlyVisible = False)
+        self.assertTrue(lod.hide_get() and lod.hide_select)
+        fixtures.resetScene()
+        bpy.ops.import_scene.fbx(filepath = self.path("Column.fbx"))
+        self.assertEqual(sorted(o.name for o in bpy.context.scene.objects), ["Column_L0", "Column_L1"])
+
+    def test_split_items_in_hidden_collections(self):
+        fixtures.resetScene()
+        outer = bpy.data.collections.new("Outer")
+        inner = bpy.data.collections.new("Inner")
+        bpy.context.scene.collection.children.link(outer)
+        outer.children.link(inner)
+        fixtures.linkObject(bpy.data.objects.new("Column_L0", fixtures.buildColumnMesh("Column")))
+        inner.objects.link(bpy.data.objects.new("Column_L1", fixtures.buildColumnMesh("Column")))
+        outerLayer = bpy.context.view_layer.layer_collection.children["Outer"]
+        outerLayer.hide_viewport = True
+        inner.hide_viewport = True
+        bpy.ops.tmtk.tmtkexporter(filepath = self.path("unused.fbx"), splitItems = True, onlyVisible = False)
+        self.assertTrue(outerLayer.hide_viewport and inner.hide_viewport)
+        self.assertFalse(outerLayer.children["Inner"].hide_viewport or outer.hide_viewport)
+        fixtures.resetScene()
+        bpy.ops.import_scene.fbx(filepath = self.path("Column.fbx"))
+        self.assertEqual(sorted(o.name for o in bpy.context.scene.objects), ["Column_L0", "Column_L1"])
+
+    def test_split_items_file_name_collision(self):
+        fixtures.resetScene()
+        for name in ("A.B", "A_B"):
+            fixtures.linkObject(bpy.data.objects.new(name + "_L0", fixtures.buildColumnMesh(name)))
+        with self.assertRaises(RuntimeError):
+            bpy.ops.tmtk.tmtkexporter(filepath = self.path("unused.fbx"), splitItems = True)
+        self.assertEqual([f for f in os.listdir(self.tempdir.name) if f.endswith(".fbx")], [])
+
+    def test_split_items_parallel(self):
+        _, arma = fixtures.buildRiggedColumn("Left")
+        fixtures.linkObject(bpy.data.objects.new("Right_L0", fixtures.buildColumnMesh("Right")))
+        rest, keys = getRestPose(arma), getKeyframes(arma)
+        with fixtures.budget(self, 60.0, 256):
+            result = bpy.ops.tmtk.tmtkexporter(filepath = self.path("unused.fbx"), splitItems = True, parallelWorkers = 2)
+        self.assertEqual(result, {'FINISHED'})
+        self.assertEqual(sorted(f for f in os.listdir(self.tempdir.name) if f.endswith(".fbx")), ["Left.fbx", "Right.fbx"])
+        self.assertRestPoseEqual(rest, getRestPose(arma))
+        self.assertKeyframesEqual(keys, getKeyframes(arma))
+        fixtures.resetScene()
+        bpy.ops.import_scene.fbx(filepath = self.path("Left.fbx"))
+        self.assertEqual(sorted(o.type for o in bpy.context.scene.objects), ["ARMATURE", "MESH"])
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,115 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Compares the lean TMTK FBX writer with Blender's FBX exporter by importing both files with Blender's importer.
+# Run from the repository root:
+#   blender -b --factory-startup --python tests/test_fbx_roundtrip.py
+
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+PLACES = 3
+POSED_FRAME = 4
+
+def importSummary(filepath):
+    # Everything the importer reconstructs which is relevant for TMTK, independent of vertex and object order
+    fixtures.resetScene()
+    bpy.ops.import_scene.fbx(filepath = filepath)
+    scene = bpy.context.scene
+    summary = {"meshes": {}, "armatures": {}}
+    for obj in bpy.data.objects:
+        if obj.type == "MESH":
+            mesh = obj.data
+            co = sorted(tuple(round(c, PLACES) for c in obj.matrix_world @ v.co) for v in mesh.vertices)
+            uvs = [sorted(tuple(round(c, PLACES) for c in d.uv) for d in layer.data) for layer in mesh.uv_layers]
+            weights = {g.name: round(sum(vg.weight for v in mesh.vertices for vg in v.groups if vg.group == g.index), PLACES)
+                       for g in obj.vertex_groups}
+            summary["meshes"][obj.name] = {
+                "vertices": co,
+                "polygons": sorted(len(p.vertices) for p in mesh.polygons),
+                "materials": [slot.material.name if slot.material else None for slot in obj.material_slots],
+                "polygonMaterials": sorted((p.material_index, tuple(round(c, PLACES) for c in obj.matrix_world @ p.center)) for p in mesh.polygons),
+                "uvs": uvs,
+                "weights": weights,
+            }
+        elif obj.type == "ARMATURE":
+            rest = {b.name: tuple(round(c, PLACES) for c in obj.matrix_world @ b.head_local) for b in obj.data.bones}
+            scene.frame_set(POSED_FRAME)
+            posed = {b.name: tuple(round(c, PLACES) for c in obj.matrix_world @ b.head) for b in obj.pose.bones}
+            action = obj.animation_data.action if obj.animation_data else None
+            frameRange = tuple(round(f, PLACES) for f in action.frame_range) if action else None
+            summary["armatures"][obj.name] = {"rest": rest, "posed": posed, "frameRange": frameRange}
+    return summary
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestLeanWriterRoundTrip(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def exportBoth(self):
+        stock = os.path.join(self.tempdir.name, "stock.fbx")
+        lean = os.path.join(self.tempdir.name, "lean.fbx")
+        objects = [o for o in bpy.context.scene.objects if o.type in ("MESH", "ARMATURE")]
+        bpy.ops.export_scene.fbx(filepath = stock, object_types = {"ARMATURE", "MESH"}, bake_space_transform = True,
+                                 axis_forward = '-Z', axis_up = 'Y', add_leaf_bones = False)
+        tmtktools.writeTMTKFBX(objects, lean)
+        return stock, lean
+
+    def assertSummariesEqual(self, stock, lean):
+        self.assertEqual(sorted(stock["meshes"].keys()), sorted(lean["meshes"].keys()))
+        for name, expected in stock["meshes"].items():
+            actual = lean["meshes"][name]
+            for key in expected:
+                self.assertEqual(expected[key], actual[key], "{}: {} differs".format(name, key))
+        self.assertEqual(sorted(stock["armatures"].keys()), sorted(lean["armatures"].keys()))
+        for name, expected in stock["armatures"].items():
+            self.assertEqual(expected, lean["armatures"][name], "{}: bones differ".format(name))
+
+    def test_static_mesh(self):
+        fixtures.resetScene()
+        fixtures.linkObject(bpy.data.objects.new("Column", fixtures.buildColumnMesh("Column")))
+        stock, lean = self.exportBoth()
+        self.assertSummariesEqual(importSummary(stock), importSummary(lean))
+
+    def test_rigged_animation(self):
+        fixtures.buildRiggedColumn()
+        stock, lean = self.exportBoth()
+        self.assertSummariesEqual(importSummary(stock), importSummary(lean))
+
+    def test_operator_with_fix_and_reduction(self):
+        # the exporter operator applies the animation fix, the lean writer also reduces the baked keys
+        fixtures.buildRiggedColumn(frames = 40)
+        stock = os.path.join(self.tempdir.name, "stock.fbx")
+        lean = os.path.join(self.tempdir.name, "lean.fbx")
+        bpy.ops.tmtk.tmtkexporter(filepath = stock)
+        bpy.ops.tmtk.tmtkexporter(filepath = lean, leanWriter = True, reduceKeyframes = True, keyframeTolerance = 0.0001)
+        self.assertSummariesEqual(importSummary(stock), importSummary(lean))
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
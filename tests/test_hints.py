@@ -0,0 +1,126 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for the cached values of TMTK_OT_Hints. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_hints.py
+
+import math
+import os
+import sys
+import unittest
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestHintsCache(unittest.TestCase):
+    def setUp(self):
+        fixtures.resetScene()
+        self.obj = fixtures.linkObject(bpy.data.objects.new("Column", fixtures.buildColumnMesh("Column")))
+        bpy.context.evaluated_depsgraph_get()
+
+    def test_moving_vertices_without_modifiers(self):
+        triangles = tmtktools.getCachedTris(self.obj)
+        low, high = tmtktools.getCachedBounds(self.obj)
+        height = high[2] - low[2]
+        fingerprint = self.obj[tmtktools.HINTS_CACHE_PROP]["fingerprint"]
+        for v in self.obj.data.vertices:
+            v.co.z *= 2.0
+        self.obj.data.update()
+        bpy.context.evaluated_depsgraph_get()
+        self.assertEqual(tmtktools.getHintsFingerprint(self.obj), fingerprint)
+        self.assertEqual(tmtktools.getCachedTris(self.obj), triangles)
+        # the bounds depend on the vertex positions and are computed again
+        low, high = tmtktools.getCachedBounds(self.obj)
+        self.assertAlmostEqual(high[2] - low[2], 2.0 * height, places = 3)
+
+    def test_moving_vertices_with_weld(self):
+        mod = self.obj.modifiers.new("Weld", "WELD")
+        mod.merge_threshold = 0.01
+        triangles = tmtktools.getCachedTris(self.obj)
+        # collapse the column, the weld modifier then removes the degenerate faces
+        for v in self.obj.data.vertices:
+            v.co = (0.0, 0.0, 0.0)
+        self.obj.data.update()
+        self.assertLess(tmtktools.getCachedTris(self.obj), triangles)
+
+    def test_rotated_bounds_follow_interior_vertex(self):
+        mesh = bpy.data.meshes.new("Diamond")
+        mesh.from_pydata([(1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, -1, 0), (0, 0, 0)], [], [(0, 1, 4), (1, 2, 4), (2, 3, 4), (3, 0, 4)])
+        obj = fixtures.linkObject(bpy.data.objects.new("Diamond", mesh))
+        obj.rotation_euler.z = math.radians(45.0)
+        bpy.context.evaluated_depsgraph_get()
+        self.assertAlmostEqual(tmtktools.getCachedBounds(obj)[1][1], math.sqrt(0.5), places = 4)
+        # stays within the local bounding box, but extends the world bounds
+        mesh.vertices[4].co = (0.9, 0.9, 0.0)
+        mesh.update()
+        bpy.context.evaluated_depsgraph_get()
+        self.assertAlmostEqual(tmtktools.getCachedBounds(obj)[1][1], 0.9 * math.sqrt(2.0), places = 4)
+
+    def test_excluded_object_not_cached(self):
+        collection = bpy.data.collections.new("Hidden LODs")
+        bpy.context.scene.collection.children.link(collection)
+        for c in self.obj.users_collection:
+            c.objects.unlink(self.obj)
+        collection.objects.link(self.obj)
+        mod = self.obj.modifiers.new("Subdivision", "SUBSURF")
+        mod.levels = 1
+        layerCollection = bpy.context.view_layer.layer_collection.children[collection.name]
+        layerCollection.exclude = True
+        # not evaluated, so the count is the one without the modifier
+        triangles = tmtktools.getCachedTris(self.obj)
+        self.assertNotIn(tmtktools.HINTS_CACHE_PROP, self.obj)
+        layerCollection.exclude = False
+        self.assertGreater(tmtktools.getCachedTris(self.obj), triangles)
+        self.assertIn(tmtktools.HINTS_CACHE_PROP, self.obj)
+
+    def test_modifier_invalidates(self):
+        triangles = tmtktools.getCachedTris(self.obj)
+        self.obj.modifiers.new("Triangulate", "TRIANGULATE")
+        self.assertEqual(tmtktools.getCachedTris(self.obj), triangles)
+        mod = self.obj.modifiers.new("Subdivision", "SUBSURF")
+        mod.levels = 1
+        self.assertGreater(tmtktools.getCachedTris(self.obj), triangles)
+
+    def test_collection_modifier_not_cached(self):
+        mod = self.obj.modifiers.new("Boolean", "BOOLEAN")
+        mod.operand_type = "COLLECTION"
+        mod.collection = bpy.data.collections.new("Cutters")
+        self.assertIsNone(tmtktools.getHintsFingerprint(self.obj))
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestCheckLODChains(unittest.TestCase):
+    def test_reports_inconsistent_chain(self):
+        fixtures.resetScene()
+        for level in range(6):
+            fixtures.linkObject(bpy.data.objects.new("Column_L{}".format(level), fixtures.buildColumnMesh("Column")))
+        bpy.data.objects["Column_L3"].location.x = 1.0
+        bpy.context.evaluated_depsgraph_get()
+        self.assertEqual(bpy.ops.tmtk.tmtkchecklodchains(), {'FINISHED'})
+        problems = tmtktools.checkAllLODChains()["Column"]
+        self.assertTrue(any(p.startswith("L3 origin") for p in problems))
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,115 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for TMTK_OT_LODGenerator. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_lod_generator.py
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestLODGenerator(unittest.TestCase):
+    def buildColumn(self):
+        fixtures.resetScene()
+        obj = fixtures.linkObject(bpy.data.objects.new("Column", fixtures.buildColumnMesh("Column", segments = 32, rings = 16)))
+        fixtures.selectOnly([obj])
+        return obj
+
+    def getChain(self, name):
+        return [bpy.data.objects.get("{}_L{}".format(name, i)) for i in range(6)]
+
+    def test_creates_lod_chain(self):
+        self.buildColumn()
+        with fixtures.budget(self, 2.0, 64):
+            bpy.ops.tmtk.tmtklodoperator()
+        lods = self.getChain("Column")
+        self.assertNotIn(None, lods)
+        self.assertEqual([lod.hide_render for lod in lods], [False] + [True] * 5)
+
+    def test_undecimated_chain_consistent(self):
+        self.buildColumn()
+        bpy.ops.tmtk.tmtklodoperator(decimate = False)
+        self.assertEqual(tmtktools.checkAllLODChains(bpy.context.evaluated_depsgraph_get()), {"Column": []})
+
+    def test_triangle_counts_monotonic(self):
+        self.buildColumn()
+        bpy.ops.tmtk.tmtklodoperator()
+        deps = bpy.context.evaluated_depsgraph_get()
+        triangles = [tmtktools.getTris(lod, deps) for lod in self.getChain("Column")]
+        self.assertEqual(triangles, sorted(triangles, reverse = True))
+        self.assertLess(triangles[5], triangles[0])
+
+    def test_chunked_triangle_counts(self):
+        self.buildColumn()
+        bpy.ops.tmtk.tmtklodoperator()
+        deps = bpy.context.evaluated_depsgraph_get()
+        triangles = [tmtktools.getTris(lod, deps) for lod in self.getChain("Column")]
+        with mock.patch.object(tmtktools, "isChunkedProcessing", lambda: True):
+            self.assertEqual([tmtktools.getTris(lod, deps) for lod in self.getChain("Column")], triangles)
+
+    def test_linked_copies(self):
+        self.buildColumn()
+        bpy.ops.tmtk.tmtklodoperator(linkedcopies = True)
+        lods = self.getChain("Column")
+        self.assertTrue(all(lod.data == lods[0].data for lod in lods))
+
+    def test_decimate_before_armature(self):
+        obj, _ = fixtures.buildRiggedColumn()
+        fixtures.selectOnly([obj])
+        bpy.ops.tmtk.tmtklodoperator()
+        for lod in self.getChain("Column")[1:]:
+            self.assertEqual([m.type for m in lod.modifiers], ["DECIMATE", "ARMATURE"])
+
+    def test_cleanup(self):
+        fixtures.resetScene()
+        # two quads touching only by position, a loose edge and an unused material slot
+        verts = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (1, 0, 0), (2, 0, 0), (2, 1, 0), (1, 1, 0), (3, 3, 3), (4, 4, 4)]
+        mesh = bpy.data.meshes.new("Dirty")
+        mesh.from_pydata(verts, [(8, 9)], [(0, 1, 2, 3), (4, 5, 6, 7)])
+        mesh.materials.append(bpy.data.materials.new("Used"))
+        mesh.materials.append(bpy.data.materials.new("Unused"))
+        fixtures.selectOnly([fixtures.linkObject(bpy.data.objects.new("Dirty", mesh))])
+        bpy.ops.tmtk.tmtklodoperator(cleanup = True)
+        cleaned = bpy.data.objects["Dirty_L0"].data
+        # the loose edge goes together with its two vertices
+        self.assertEqual(len(cleaned.vertices), 6)
+        self.assertEqual(len(cleaned.edges), 7)
+        self.assertEqual(len(cleaned.polygons), 2)
+        self.assertEqual([m.name for m in cleaned.materials], ["Used"])
+
+    def test_duplicates_across_grid_cells(self):
+        # closer than the merge distance, but on both sides of a multiple of it
+        co = np.array([(4e-5, 0.0, 0.0), (6e-5, 0.0, 0.0), (3e-4, 0.0, 0.0), (1.0, 1.0, 1.0)])
+        self.assertEqual(tmtktools.findDuplicateVertices(co, 1e-4).tolist(), [0, 0, 2, 3])
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
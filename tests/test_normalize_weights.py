@@ -0,0 +1,98 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for TMTK_OT_NormalizeWeights. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_normalize_weights.py
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+def getWeights(obj):
+    return [sorted((obj.vertex_groups[g.group].name, g.weight) for g in v.groups) for v in obj.data.vertices]
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestNormalizeWeights(unittest.TestCase):
+    def assertNormalized(self, obj):
+        for v in obj.data.vertices:
+            self.assertLessEqual(len(v.groups), tmtktools.MAXINFLUENCERS)
+            self.assertGreater(len(v.groups), 0)
+            self.assertAlmostEqual(sum(g.weight for g in v.groups), 1.0, places = 6)
+            for g in v.groups:
+                # weights are quantized to the precision TMTK expects
+                scaled = g.weight * 2**tmtktools.PRECISION
+                self.assertEqual(scaled, round(scaled))
+
+    def test_normalize(self):
+        fixtures.resetScene()
+        obj = fixtures.buildWeightedGrid()
+        fixtures.selectOnly([obj])
+        with fixtures.budget(self, 2.0, 64):
+            bpy.ops.tmtk.tmtknormalizeoperator()
+        self.assertNormalized(obj)
+
+    def test_chunked_matches_single_shot(self):
+        fixtures.resetScene()
+        single = fixtures.buildWeightedGrid("Single")
+        chunked = fixtures.buildWeightedGrid("Chunked")
+        fixtures.selectOnly([single])
+        bpy.ops.tmtk.tmtknormalizeoperator()
+        fixtures.selectOnly([chunked])
+        with mock.patch.object(tmtktools, "getBlockSize", lambda bytesPerElement: 100):
+            with fixtures.budget(self, 2.0, 64):
+                bpy.ops.tmtk.tmtknormalizeoperator()
+        self.assertNormalized(chunked)
+        self.assertEqual(getWeights(single), getWeights(chunked))
+
+    def test_transfer_to_lods(self):
+        fixtures.resetScene()
+        obj = fixtures.buildWeightedGrid()
+        fixtures.selectOnly([obj])
+        bpy.ops.tmtk.tmtklodoperator()
+        lods = [bpy.data.objects["Grid_L{}".format(i)] for i in range(6)]
+        for lod in lods[1:]:
+            lod.vertex_groups.clear()
+        fixtures.selectOnly([lods[3]])
+        with fixtures.budget(self, 3.0, 64):
+            bpy.ops.tmtk.tmtknormalizeoperator(transferToLODs = True, applyMods = True)
+        self.assertNormalized(lods[0])
+        sourceCo = np.array([tuple(lods[0].matrix_world @ v.co) for v in lods[0].data.vertices])
+        sourceWeights = getWeights(lods[0])
+        for lod in lods[1:]:
+            self.assertLess(len(lod.data.vertices), len(sourceCo))
+            for v, weights in zip(lod.data.vertices, getWeights(lod)):
+                # any of the nearest L0 vertices, several can be equally near
+                distances = np.linalg.norm(sourceCo - np.array(lod.matrix_world @ v.co), axis = 1)
+                nearest = np.flatnonzero(distances <= distances.min() + 1e-6)
+                self.assertIn(weights, [sourceWeights[i] for i in nearest], "{} vertex {}".format(lod.name, v.index))
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,176 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Tests for the operators of the tmtk_templates addon. Run from the repository root:
+#   blender -b --factory-startup --python tests/test_templates.py
+
+import os
+import sys
+import tempfile
+import re
+import types
+import unittest
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if bpy is not None:
+    import tmtktools
+    import fixtures
+
+def setUpModule():
+    if bpy is not None:
+        fixtures.registerAddons()
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestAddTMTKTemplate(unittest.TestCase):
+    def setUp(self):
+        # a template item with LODs, standing on the ground like a non-grid item
+        self.tempdir = tempfile.TemporaryDirectory()
+        # like the template menu, the operator gets the item path without extension and picks a variant file
+        self.filepath = os.path.join(self.tempdir.name, "Column")
+        fixtures.resetScene()
+        for level in range(6):
+            fixtures.linkObject(bpy.data.objects.new("Column_L{}".format(level), fixtures.buildColumnMesh("Column")))
+        bpy.ops.export_scene.fbx(filepath = self.filepath + ".fbx", object_types = {"MESH"})
+        fixtures.resetScene()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def getBottom(self, objects):
+        return min((o.matrix_world @ v.co).z for o in objects for v in o.data.vertices)
+
+    def test_grid_item_without_lods(self):
+        with fixtures.budget(self, 5.0, 128):
+            bpy.ops.mesh.tmtk_template_add(filepath = self.filepath, grid = True, includeLODs = False)
+        objects = list(bpy.context.scene.objects)
+        self.assertEqual([o.name for o in objects if re.search(r"_L[1-5]$", o.name)], [])
+        self.assertEqual(len(objects), 1)
+        # grid items are centered vertically
+        self.assertAlmostEqual(self.getBottom(objects), -1.0, places = 3)
+
+    def test_ground_item_with_lods(self):
+        bpy.ops.mesh.tmtk_template_add(filepath = self.filepath, grid = False, includeLODs = True)
+        objects = list(bpy.context.scene.objects)
+        self.assertEqual(sorted(o.name for o in objects), ["Column_L{}".format(i) for i in range(6)])
+        self.assertAlmostEqual(self.getBottom(objects), 0.0, places = 3)
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestTemplateMenu(unittest.TestCase):
+    def setUp(self):
+        import tmtk_templates
+        self.addon = tmtk_templates
+        self.module = tmtk_templates.tmtk_templates
+        self.tempdir = tempfile.TemporaryDirectory()
+        for folder in ("Walls", "Roof Parts"):
+            os.mkdir(os.path.join(self.tempdir.name, folder))
+            open(os.path.join(self.tempdir.name, folder, "Item.fbx"), "wb").close()
+        # re-enable the addon on the temporary template directory
+        self.addon.unregister()
+        self.fullpath = self.module.fullpath
+        self.module.fullpath = self.tempdir.name
+        self.addon.register()
+
+    def tearDown(self):
+        self.addon.unregister()
+        self.module.fullpath = self.fullpath
+        self.addon.register()
+        self.tempdir.cleanup()
+
+    def test_scan_deferred_until_draw(self):
+        self.assertIsNone(self.module.templateFolders)
+        self.assertEqual(self.module.get_template_folders(), ["Roof Parts", "Walls"])
+        self.assertEqual(self.module.get_templates("Walls"), ["Item"])
+
+    def test_draw_submenus(self):
+        layout = RecordingLayout(contextStrings = True)
+        self.module.VIEW3D_MT_TMTK_template_menu.draw(types.SimpleNamespace(layout = layout), bpy.context)
+        self.assertEqual(layout.calls, [("context_string_set", self.module.FOLDER_CONTEXT, "Roof Parts"),
+                                        ("menu", self.module.VIEW3D_MT_TMTK_template_submenu.bl_idname, "Roof Parts"),
+                                        ("context_string_set", self.module.FOLDER_CONTEXT, "Walls"),
+                                        ("menu", self.module.VIEW3D_MT_TMTK_template_submenu.bl_idname, "Walls")])
+        layout = RecordingLayout(contextStrings = True)
+        context = types.SimpleNamespace(**{self.module.FOLDER_CONTEXT: "Walls"})
+        self.module.VIEW3D_MT_TMTK_template_submenu.draw(types.SimpleNamespace(layout = layout), context)
+        self.assertEqual([(c[0], c[1], c[2].filepath) for c in layout.calls], [("operator", "Item", os.path.join(self.tempdir.name, "Walls", "Item"))])
+
+    def test_draw_sections(self):
+        # Blender versions without context_string_set
+        layout = RecordingLayout(contextStrings = False)
+        self.module.VIEW3D_MT_TMTK_template_menu.draw(types.SimpleNamespace(layout = layout), bpy.context)
+        self.assertEqual([c[0] for c in layout.calls], ["label", "operator", "separator", "label", "operator"])
+
+class RecordingLayout:
+    # Stand-in for UILayout, menus can not be drawn in background mode
+    def __init__(self, contextStrings):
+        self.calls = []
+        self.operator_context = None
+        if contextStrings:
+            self.context_string_set = lambda name, value: self.calls.append(("context_string_set", name, value))
+
+    def row(self):
+        return self
+
+    def menu(self, idname, text = ""):
+        self.calls.append(("menu", idname, text))
+
+    def label(self, text = ""):
+        self.calls.append(("label",))
+
+    def separator(self):
+        self.calls.append(("separator",))
+
+    def operator(self, idname, text = ""):
+        props = types.SimpleNamespace()
+        self.calls.append(("operator", text, props))
+        return props
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class TestAddTMTKWallKit(unittest.TestCase):
+    def test_kit(self):
+        fixtures.resetScene()
+        with fixtures.budget(self, 5.0, 128):
+            bpy.ops.mesh.tmtk_wall_kit_add(minWidth = 1.0, maxWidth = 2.0, widthStep = 1.0, heights = "1, 2")
+        # 4 walls, 2 corners and 2 caps, each with L0-L5
+        self.assertEqual(len(bpy.context.scene.objects), 8 * 6)
+        results = tmtktools.checkAllLODChains(bpy.context.evaluated_depsgraph_get())
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(len(problems) == 0 for problems in results.values()))
+
+    def test_second_kit_keeps_lod_suffix(self):
+        fixtures.resetScene()
+        for _ in range(2):
+            bpy.ops.mesh.tmtk_wall_kit_add(minWidth = 1.0, maxWidth = 1.0, heights = "1", corners = False, caps = False)
+        self.assertEqual(sorted(o.name for o in bpy.context.scene.objects),
+                         sorted("TMTKWall_1x1{}_L{}".format(suffix, level) for suffix in ("", "_1") for level in range(6)))
+
+    def test_change_shared_mesh(self):
+        fixtures.resetScene()
+        bpy.ops.mesh.tmtk_wall_kit_add(minWidth = 1.0, maxWidth = 1.0, heights = "1", corners = False, caps = False)
+        lods = [bpy.data.objects["TMTKWall_1x1_L{}".format(level)] for level in range(6)]
+        # a changed topology forces the wall operator to rebuild the mesh
+        mesh = lods[0].data
+        mesh.vertices.add(1)
+        mesh.update()
+        fixtures.selectOnly([lods[0]])
+        bpy.ops.mesh.tmtk_wall_add(change = True, height = 2.0, width = 1.0, grid = True)
+        self.assertTrue(all(o.data == lods[0].data for o in lods))
+        self.assertAlmostEqual(lods[5].dimensions.z, 2.0, places = 3)
+
+if __name__ == "__main__":
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv = argv, exit = False).result
+    sys.exit(0 if result.wasSuccessful() else 1)
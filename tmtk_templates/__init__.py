@@ -23,14 +23,16 @@ import bpy
 from bpy.types import Menu
 import os
 from . import add_tmtk_wall
+from . import add_tmtk_wall_kit
 from . import tmtk_templates
 from . import add_wallsign_reference
 
 import bpy.utils.previews
-icons_dict = []
+icons_dict = None
 
 classes = [
     add_tmtk_wall.AddTMTKWall,
+    add_tmtk_wall_kit.AddTMTKWallKit,
     add_wallsign_reference.AddWallSignReference
 ]
 
@@ -39,9 +41,11 @@ def menu_func(self, context):
     layout.operator_context = 'INVOKE_REGION_WIN'
 
     layout.separator()
-    layout.menu(tmtk_templates.VIEW3D_MT_TMTK_template_menu.bl_idname, text = "TMTK Template", icon_value = icons_dict['planco'].icon_id)
-    layout.operator(add_tmtk_wall.AddTMTKWall.bl_idname, text="TMTK wall (generative)", icon_value = icons_dict['planco'].icon_id)
-    layout.operator(add_wallsign_reference.AddWallSignReference.bl_idname, text="Wall sign reference", icon_value = icons_dict['planco'].icon_id)
+    icon = get_icon_id()
+    layout.menu(tmtk_templates.VIEW3D_MT_TMTK_template_menu.bl_idname, text = "TMTK Template", icon_value = icon)
+    layout.operator(add_tmtk_wall.AddTMTKWall.bl_idname, text="TMTK wall (generative)", icon_value = icon)
+    layout.operator(add_tmtk_wall_kit.AddTMTKWallKit.bl_idname, text="TMTK wall kit (generative)", icon_value = icon)
+    layout.operator(add_wallsign_reference.AddWallSignReference.bl_idname, text="Wall sign reference", icon_value = icon)
 
 def TMTK_context_menu(self, context):
     bl_label = 'Change'
@@ -65,12 +69,20 @@ def loadicon():
     icons_dir = os.path.dirname(__file__)
     icons_dict.load("planco", os.path.join(icons_dir, "icon.png"), 'IMAGE')
 
+def get_icon_id():
+    # the icon is only loaded once the Add Mesh menu is drawn for the first time
+    if icons_dict is None:
+        loadicon()
+    return icons_dict['planco'].icon_id
+
 def register():
     from bpy.utils import register_class
-    loadicon()
     allClasses = classes + tmtk_templates.TMTKTEMPLATES_CLASSES
     for cls in allClasses:
         register_class(cls)
+    if not tmtk_templates.LAZY_REGISTRATION:
+        loadicon()
+        tmtk_templates.get_template_folders()
 
     # Add "Extras" menu to the "Add Mesh" menu and context menu.
     bpy.types.VIEW3D_MT_mesh_add.append(menu_func)
@@ -78,14 +90,18 @@ def register():
 
 
 def unregister():
+    global icons_dict
     # Remove "Extras" menu from the "Add Mesh" menu and context menu.
     bpy.types.VIEW3D_MT_object_context_menu.remove(TMTK_context_menu)
     bpy.types.VIEW3D_MT_mesh_add.remove(menu_func)
+    tmtk_templates.clear_catalog()
     allClasses = classes + tmtk_templates.TMTKTEMPLATES_CLASSES
     from bpy.utils import unregister_class
     for cls in reversed(allClasses):
         unregister_class(cls)
-    bpy.utils.previews.remove(icons_dict)
+    if icons_dict is not None:
+        bpy.utils.previews.remove(icons_dict)
+        icons_dict = None
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -14,6 +14,22 @@ from mathutils import Vector, Matrix
 from bpy.props import FloatProperty, IntProperty, BoolProperty
 from bpy_extras import object_utils
 
+WALL_FRONT = 0.125
+WALL_BACK = -0.25
+
+def box_geometry(x0, x1, y0, y1, z0, z1):
+    verts = []
+    verts += [Vector((x0, y1, z0)), Vector((x0, y1, z1))]
+    verts += [Vector((x1, y1, z0)), Vector((x1, y1, z1))]
+    verts += [Vector((x1, y0, z0)), Vector((x1, y0, z1))]
+    verts += [Vector((x0, y0, z0)), Vector((x0, y0, z1))]
+
+    faces = [[i % 8 for i in range(j, j+4)] for j in range(0,8,2)]
+    faces = [[a,b,d,c] for [a,b,c,d] in faces]
+    faces += [[i % 8 for i in range(0,8)[::2]]]
+    faces += [[i % 8 for i in range(0,8)[::-2]]]
+    return verts, faces
+
 def create_mesh_object(context, self, verts, edges, faces, name):
 
     # Create new mesh
@@ -27,6 +43,24 @@ def create_mesh_object(context, self, verts, edges, faces, name):
 
     return object_utils.object_data_add(context, mesh, operator=self)
 
+def update_mesh_in_place(mesh, verts, faces):
+    # Overwrite the vertex coordinates of an existing mesh if its topology matches verts/faces.
+    # Returns False (and leaves the mesh untouched) if the topology differs.
+    if len(mesh.vertices) != len(verts) or len(mesh.polygons) != len(faces):
+        return False
+    loopTotals = [0] * len(mesh.polygons)
+    mesh.polygons.foreach_get("loop_total", loopTotals)
+    if loopTotals != [len(f) for f in faces]:
+        return False
+    loopVerts = [0] * len(mesh.loops)
+    mesh.loops.foreach_get("vertex_index", loopVerts)
+    if loopVerts != [i for f in faces for i in f]:
+        return False
+
+    mesh.vertices.foreach_set("co", [c for v in verts for c in v])
+    mesh.update()
+    return True
+
 
 class AddTMTKWall(Operator, object_utils.AddObjectHelper):
     bl_idname = "mesh.tmtk_wall_add"
@@ -61,19 +95,8 @@ class AddTMTKWall(Operator, object_utils.AddObjectHelper):
 
     @classmethod
     def add_wall(cls, height, width, grid):
-        yp = 0.125
-        yn = -0.25
         width2 = width / 2
-        verts = []
-        verts += [Vector((-width2, yp, 0.0)), Vector((-width2, yp, height))]
-        verts += [Vector((width2, yp, 0.0)), Vector((width2, yp, height))]
-        verts += [Vector((width2, yn, 0.0)), Vector((width2, yn, height))]
-        verts += [Vector((-width2, yn, 0.0)), Vector((-width2, yn, height))]
-
-        faces = [[i % 8 for i in range(j, j+4)] for j in range(0,8,2)]
-        faces = [[a,b,d,c] for [a,b,c,d] in faces]
-        faces += [[i % 8 for i in range(0,8)[::2]]]
-        faces += [[i % 8 for i in range(0,8)[::-2]]]
+        verts, faces = box_geometry(-width2, width2, WALL_BACK, WALL_FRONT, 0.0, height)
 
         if (grid):
             for v in verts:
@@ -100,16 +123,20 @@ class AddTMTKWall(Operator, object_utils.AddObjectHelper):
                 oldmeshname = obj.data.name
 
                 verts, faces = AddTMTKWall.add_wall(self.height, self.width, self.grid)
-                mesh = bpy.data.meshes.new("TMP")
-                mesh.from_pydata(verts, [], faces)
-                mesh.update()
-                obj.data = mesh
-
-                for material in oldmesh.materials:
-                    obj.data.materials.append(material)
-
-                bpy.data.meshes.remove(oldmesh)
-                obj.data.name = oldmeshname
+                # only rebuild the mesh if the user changed its topology, otherwise just move the vertices
+                if not update_mesh_in_place(oldmesh, verts, faces):
+                    mesh = bpy.data.meshes.new("TMP")
+                    mesh.from_pydata(verts, [], faces)
+                    mesh.update()
+                    obj.data = mesh
+
+                    for material in oldmesh.materials:
+                        obj.data.materials.append(material)
+
+                    # other objects, e.g. the LODs of a wall kit piece, may share the old mesh
+                    oldmesh.user_remap(mesh)
+                    bpy.data.meshes.remove(oldmesh)
+                    obj.data.name = oldmeshname
             else:
                 verts, faces = AddTMTKWall.add_wall(self.height, self.width, self.grid)
                 obj = create_mesh_object(context, self, verts, [], faces, "Wall")
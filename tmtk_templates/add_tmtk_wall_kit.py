@@ -0,0 +1,246 @@
+"""
+Copyright © 2023 Gohax
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import bpy
+from bpy.types import Operator
+from bpy.props import FloatProperty, BoolProperty, StringProperty
+from itertools import accumulate
+from .add_tmtk_wall import box_geometry, TMTKWallParameters, WALL_FRONT, WALL_BACK
+
+KIT_MATERIAL = "TMTKWallKit"
+KIT_COLLECTION = "TMTK Wall Kit"
+LOD_LEVELS = 6
+# looked up when the first kit is added instead of at import
+LOOP_TOTAL_WRITABLE = None
+def loop_total_writable():
+    global LOOP_TOTAL_WRITABLE
+    if LOOP_TOTAL_WRITABLE is None:
+        # Blender 4.0 made loop_total read-only, it is derived from loop_start there
+        LOOP_TOTAL_WRITABLE = not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly
+    return LOOP_TOTAL_WRITABLE
+
+def mesh_from_geometry(name, verts, faces):
+    # Build a mesh with the bulk foreach_set API instead of from_pydata
+    mesh = bpy.data.meshes.new(name)
+    loopTotals = [len(f) for f in faces]
+    loopStarts = [0] + list(accumulate(loopTotals))[:-1]
+
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", [c for v in verts for c in v])
+    mesh.loops.add(sum(loopTotals))
+    mesh.loops.foreach_set("vertex_index", [i for f in faces for i in f])
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", loopStarts)
+    if loop_total_writable():
+        mesh.polygons.foreach_set("loop_total", loopTotals)
+    mesh.update(calc_edges = True)
+    return mesh
+
+def format_length(value):
+    return "{:g}".format(round(value, 3))
+
+def unique_name(name, levels):
+    # Blender would append .001 to the object names, which breaks the _Lx suffix of the LODs
+    candidate = name
+    suffix = 1
+    while bpy.data.meshes.get(candidate) is not None or \
+        any(bpy.data.objects.get("{}_L{}".format(candidate, level)) is not None for level in levels):
+        candidate = "{}_{}".format(name, suffix)
+        suffix += 1
+    return candidate
+
+class AddTMTKWallKit(Operator):
+    bl_idname = "mesh.tmtk_wall_kit_add"
+    bl_label = "Add TMTK Wall Kit"
+    bl_description = "Add a modular set of walls, corners and caps in all grid sizes, including LODs"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    minWidth: FloatProperty(
+        name="Minimum Width",
+        description="Width of the narrowest wall",
+        min=0.5,
+        max=8.0,
+        default=0.5
+    )
+
+    maxWidth: FloatProperty(
+        name="Maximum Width",
+        description="Width of the widest wall",
+        min=0.5,
+        max=8.0,
+        default=8.0
+    )
+
+    widthStep: FloatProperty(
+        name="Width Step",
+        description="Grid step between two wall widths",
+        min=0.25,
+        max=8.0,
+        default=0.5
+    )
+
+    heights: StringProperty(
+        name="Heights",
+        description="Comma separated list of wall heights",
+        default="1, 2, 4"
+    )
+
+    corners: BoolProperty(
+        name="Corners",
+        description="Add a corner piece for each height",
+        default=True
+    )
+
+    caps: BoolProperty(
+        name="Caps",
+        description="Add a cap piece for each width",
+        default=True
+    )
+
+    capHeight: FloatProperty(
+        name="Cap Height",
+        description="Height of the cap pieces",
+        min=0.05,
+        max=1.0,
+        default=0.125
+    )
+
+    grid : BoolProperty(
+            name = "Grid",
+            default = True,
+            description = "Grid item?"
+    )
+
+    includeLODs : BoolProperty(
+        name = "Include LODs",
+        default = True,
+        description = "Also add the LODs L1-L5 for each piece"
+    )
+
+    spacing: FloatProperty(
+        name="Spacing",
+        description="Gap between the pieces of the kit",
+        min=0.0,
+        max=10.0,
+        default=1.0
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        box = layout.box()
+        box.prop(self, "minWidth")
+        box.prop(self, "maxWidth")
+        box.prop(self, "widthStep")
+        box.prop(self, "heights")
+        box = layout.box()
+        box.prop(self, "corners")
+        row = box.row()
+        row.prop(self, "caps")
+        row.prop(self, "capHeight")
+        box.prop(self, "grid")
+        box.prop(self, "includeLODs")
+        box.prop(self, "spacing")
+
+    def parse_heights(self):
+        heights = []
+        for h in self.heights.replace(";", ",").split(","):
+            if len(h.strip()) == 0:
+                continue
+            heights.append(min(max(float(h), 0.25), 8.0))
+        return sorted(set(heights))
+
+    def widths(self):
+        widths = []
+        width = self.minWidth
+        while width <= self.maxWidth + 1e-6:
+            widths.append(width)
+            width += self.widthStep
+        return widths
+
+    def pieces(self, heights, widths):
+        # each row of pieces is a list of (name, width, height, geometry, wall parameters)
+        rows = []
+        for height in heights:
+            rows.append([("TMTKWall_{}x{}".format(format_length(w), format_length(height)), w, height,
+                          box_geometry(-w / 2.0, w / 2.0, WALL_BACK, WALL_FRONT, 0.0, height),
+                          {"height": height, "width": w, "grid": self.grid})
+                         for w in widths])
+        if self.corners:
+            thickness = WALL_FRONT - WALL_BACK
+            rows.append([("TMTKWallCorner_{}".format(format_length(height)), thickness, height,
+                          box_geometry(WALL_BACK, WALL_FRONT, WALL_BACK, WALL_FRONT, 0.0, height), None)
+                         for height in heights])
+        if self.caps:
+            rows.append([("TMTKWallCap_{}".format(format_length(w)), w, self.capHeight,
+                          box_geometry(-w / 2.0, w / 2.0, WALL_BACK, WALL_FRONT, 0.0, self.capHeight), None)
+                         for w in widths])
+        return rows
+
+    def execute(self, context):
+        try:
+            heights = self.parse_heights()
+        except ValueError:
+            self.report({'WARNING'}, "Cancelled: Heights must be a comma separated list of numbers")
+            return {'CANCELLED'}
+        widths = self.widths()
+        if len(heights) == 0 or len(widths) == 0:
+            self.report({'WARNING'}, "Cancelled: Kit would not contain any walls")
+            return {'CANCELLED'}
+
+        if bpy.context.mode == "EDIT_MESH":
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        material = bpy.data.materials.get(KIT_MATERIAL)
+        if material is None:
+            material = bpy.data.materials.new(KIT_MATERIAL)
+
+        collection = bpy.data.collections.new(KIT_COLLECTION)
+        context.collection.children.link(collection)
+
+        origin = context.scene.cursor.location
+        thickness = WALL_FRONT - WALL_BACK
+        lodLevels = range(LOD_LEVELS) if self.includeLODs else range(1)
+        objects = []
+        firstObject = None
+        for rowIndex, row in enumerate(self.pieces(heights, widths)):
+            cursor = 0.0
+            for name, width, height, (verts, faces), parameters in row:
+                name = unique_name(name, lodLevels)
+                if self.grid:
+                    for v in verts:
+                        v.z -= height / 2.0
+                mesh = mesh_from_geometry(name, verts, faces)
+                mesh.materials.append(material)
+                if parameters is not None:
+                    mesh["TMTKWall"] = True
+                    mesh["change"] = False
+                    for prm in TMTKWallParameters():
+                        mesh[prm] = parameters[prm]
+
+                location = (origin.x + cursor + width / 2.0, origin.y - rowIndex * (thickness + self.spacing), origin.z)
+                cursor += width + self.spacing
+                # a box can not be simplified any further, so every LOD shares the L0 mesh
+                for level in lodLevels:
+                    obj = bpy.data.objects.new("{}_L{}".format(name, level), mesh)
+                    obj.location = location
+                    obj.hide_render = level > 0
+                    objects.append(obj)
+                    if firstObject is None:
+                        firstObject = obj
+
+        for obj in objects:
+            collection.objects.link(obj)
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        firstObject.select_set(True)
+        context.view_layer.objects.active = firstObject
+
+        self.report({'INFO'}, "Added wall kit with {} pieces".format(len(objects) // len(lodLevels)))
+        return {'FINISHED'}
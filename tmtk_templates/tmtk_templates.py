@@ -26,9 +26,14 @@ def get_items(self, context):
 
 IGLOB_ROOT_DIR_AVAIL = bpy.app.version >= (3,2,0)
 CAN_APPLY_MULTIUSER_TRANSFORMS = bpy.app.version >= (3,2,2)
+# Variant lists are requested on every redraw of the redo panel, so they are cached per path.
+# Keeping the lists alive also keeps the enum item strings valid for Blender.
+variantCache = {}
 def getVariants(path):
     if path == None:
         return []
+    if path in variantCache:
+        return variantCache[path]
     split = os.path.split(path)
     if (IGLOB_ROOT_DIR_AVAIL):
         candidates = list(glob.iglob('**.fbx', root_dir = os.path.join(fullpath, split[0]), recursive=True))
@@ -38,6 +43,7 @@ def getVariants(path):
     variants = sorted(list(filter(lambda x: re.match(re.escape(filename_base) + "(_.*)?.fbx", x) != None, candidates)))
     variants = [(j, j.replace(".fbx", ""), '', '', i) for i, j in enumerate(variants)]
 
+    variantCache[path] = variants
     return variants
 
 class AddTMTKTemplate(Operator, object_utils.AddObjectHelper):
@@ -138,17 +144,44 @@ class VIEW3D_MT_TMTK_template_menu(Menu):
     def draw(self, context):
         layout = self.layout
         layout.operator_context = 'INVOKE_REGION_WIN'
-        for menu in submenus:
-            layout.menu(menu.bl_idname)
+        # the template directory is scanned when the menu is drawn for the first time
+        folders = get_template_folders()
+        if hasattr(layout, "context_string_set"):
+            for folder in folders:
+                # each row passes its folder to the one generic submenu
+                row = layout.row()
+                row.context_string_set(FOLDER_CONTEXT, folder)
+                row.menu(VIEW3D_MT_TMTK_template_submenu.bl_idname, text = folder)
+        else:
+            # older Blender versions can not pass the folder to a submenu, so each folder gets a section
+            for i, folder in enumerate(folders):
+                if i > 0:
+                    layout.separator()
+                layout.label(text = folder)
+                draw_templates(layout, folder)
 
+class VIEW3D_MT_TMTK_template_submenu(Menu):
+    bl_idname = "VIEW3D_MT_TMTK_template_submenu"
+    bl_label = "Template Folder"
 
-def submenu_draw(self, context):
-    layout = self.layout
-    layout.operator_context = 'INVOKE_REGION_WIN'
+    def draw(self, context):
+        layout = self.layout
+        layout.operator_context = 'INVOKE_REGION_WIN'
+        folder = getattr(context, FOLDER_CONTEXT, None)
+        if folder is not None:
+            draw_templates(layout, folder)
+
+def draw_templates(layout, subfolder):
+    for f in get_templates(subfolder):
+        layout.operator(AddTMTKTemplate.bl_idname, text = f).filepath = os.path.join(fullpath, subfolder, f)
+
+def get_templates(subfolder):
+    if subfolder in templateCatalog:
+        return templateCatalog[subfolder]
     if (IGLOB_ROOT_DIR_AVAIL):
-        files = list(glob.iglob('**.fbx', root_dir = os.path.join(fullpath, self.subfolder), recursive=True))
+        files = list(glob.iglob('**.fbx', root_dir = os.path.join(fullpath, subfolder), recursive=True))
     else:
-        files = [os.path.split(f)[1] for f in (glob.iglob(os.path.join(fullpath, self.subfolder, '**.fbx'), recursive=True))]
+        files = [os.path.split(f)[1] for f in (glob.iglob(os.path.join(fullpath, subfolder, '**.fbx'), recursive=True))]
 
     filtered = []
     for f in files:
@@ -156,32 +189,32 @@ def submenu_draw(self, context):
         filtered.append(normalized)
 
     filtered = list(dict.fromkeys(sorted(filtered)))
-    for f in filtered:
-        layout.operator(AddTMTKTemplate.bl_idname, text = f).filepath = os.path.join(fullpath, self.subfolder, f)
-
-submenus = []
-classTemplate = "VIEW3D_MT_TMTK_template_submenu_{}"
-
-def init_module():
-    global TMTKTEMPLATES_CLASSES
-    subfolders = [f.name for f in os.scandir(fullpath) if f.is_dir()]
-    for folder in subfolders:
-        suffix = folder.replace(" ", "_")
-        submenu = type(classTemplate.format(suffix), (Menu,), {
-            # data members
-            "bl_idname": classTemplate.format(suffix),
-            "bl_label": folder,
-            "subfolder": folder,
-
-            # member functions
-            "draw": submenu_draw
-        })
-        submenus.append(submenu)
-    TMTKTEMPLATES_CLASSES += submenus
+    templateCatalog[subfolder] = filtered
+    return filtered
+
+# If enabled, the template directory is only scanned and the icon only loaded once the menus are drawn for the first time.
+# Otherwise both happen when the addon is registered, like before the menus were loaded lazily.
+LAZY_REGISTRATION = True
+
+FOLDER_CONTEXT = "tmtk_template_folder"
+templateFolders = None
+templateCatalog = {}
+
+def get_template_folders():
+    global templateFolders
+    if templateFolders is None:
+        templateFolders = sorted(f.name for f in os.scandir(fullpath) if f.is_dir()) if os.path.isdir(fullpath) else []
+    return templateFolders
+
+def clear_catalog():
+    # reenabling the addon picks up new templates
+    global templateFolders
+    templateFolders = None
+    templateCatalog.clear()
+    variantCache.clear()
 
 TMTKTEMPLATES_CLASSES = [
     VIEW3D_MT_TMTK_template_menu,
+    VIEW3D_MT_TMTK_template_submenu,
     AddTMTKTemplate
 ]
-
-init_module()
\ No newline at end of file
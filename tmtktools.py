@@ -9,10 +9,33 @@ THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR I
 """
 
 import bpy
+import bmesh
 from mathutils import Matrix
 from mathutils import Vector
+import mathutils.kdtree
+from bpy_extras.io_utils import axis_conversion
+import contextlib
+import ctypes
+import datetime
+import hashlib
+import itertools
+import json
+import math
+import numpy as np
 import os
 import re
+import shutil
+import subprocess
+import struct
+import sys
+import tempfile
+import time
+import zlib
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
 
 
 bl_info = {
@@ -35,12 +58,57 @@ def getTris(obj, deps=None):
         deps = bpy.context.evaluated_depsgraph_get()
     ev = obj.evaluated_get(deps)
     mesh = ev.data if obj.type == "MESH" else ev.to_mesh()
+    if isChunkedProcessing():
+        # a polygon with n corners always yields n - 2 triangles, no need to build the loop triangles
+        return countMeshTriangles(mesh)
     mesh.calc_loop_triangles()
     return len(mesh.loop_triangles)
 
+# Estimated working memory per vertex, used to turn the block memory preference into a block size
+WEIGHT_BYTES_PER_VERTEX = 2048
+
+def isChunkedProcessing():
+    preferences = getPreferences()
+    return preferences is not None and preferences.chunkedProcessing
+
+def getBlockSize(bytesPerElement):
+    # None unless chunked processing is enabled in the addon preferences
+    if not isChunkedProcessing():
+        return None
+    return max(1024, getPreferences().memoryCap * 1024 * 1024 // bytesPerElement)
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [("cb", ctypes.c_uint32), ("PageFaultCount", ctypes.c_uint32)] + \
+               [(name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                                                     "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+def getPeakMemory():
+    # Peak resident set size of the Blender process in bytes, None if it can not be determined
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+def getMemoryInfo(peakBefore):
+    # Appended to operator reports when chunked processing is enabled. The peak is the lifetime peak of the
+    # whole Blender process, the increase over peakBefore is what the operator added on top of it.
+    peak = getPeakMemory()
+    if not isChunkedProcessing() or peak is None or peakBefore is None:
+        return ""
+    return " Process peak memory: {:.0f} MB (raised by {:.0f} MB).".format(peak / (1024 * 1024), (peak - peakBefore) / (1024 * 1024))
+
 CONTEXT_TEMP_OVERWRITE_API = VERSION >= (4, 0, 0)
 LOD_SUPPORTED_TYPES = ["MESH", "FONT", "CURVE"]
-CAN_MOVE_MODIFIERS = "modifier_move_to_index" in dir(bpy.ops.object)
+# modifier_move_to_index was introduced in 2.90; checking the version avoids introspecting bpy.ops at import time
+CAN_MOVE_MODIFIERS = VERSION >= (2, 90, 0)
 DECIMATE_BEFORE_ARMA_TOOLTIP = "If an armature modifier is present, move decimate modifier above it in the modifier stack (recommended)"
 DECIMATE_BEFORE_ARMA_TOOLTIP_ALT = "Not available in this Blender version"
 class TMTK_OT_LODGenerator(bpy.types.Operator):
@@ -52,6 +120,7 @@ class TMTK_OT_LODGenerator(bpy.types.Operator):
                                                description = DECIMATE_BEFORE_ARMA_TOOLTIP if CAN_MOVE_MODIFIERS else DECIMATE_BEFORE_ARMA_TOOLTIP_ALT,
                                                default = CAN_MOVE_MODIFIERS)
     linkedcopies: bpy.props.BoolProperty(name="Create linked copies", description = "LODs reference the same mesh data as L0, as opposed to using deep copies",default=False)
+    cleanup: bpy.props.BoolProperty(name="Clean up mesh first", description = "Merge duplicate vertices and remove faces without area, loose edges and unused material slots before creating the LODs",default=False)
     bl_options = {'REGISTER', 'UNDO'}
 
     @classmethod
@@ -60,6 +129,8 @@ class TMTK_OT_LODGenerator(bpy.types.Operator):
 
     def execute(self, context):
         meshObjects = [o for o in bpy.context.selected_objects if o.type in LOD_SUPPORTED_TYPES]
+        if (self.cleanup):
+            self.report({'INFO'}, cleanupObjects(meshObjects))
         for obj in meshObjects:
             obj.name = re.sub("_L0$", "", obj.name)
             triangles = getTris(obj)
@@ -115,8 +186,1026 @@ class TMTK_OT_LODGenerator(bpy.types.Operator):
         row.enabled = self.decimate and CAN_MOVE_MODIFIERS
         row = col.row()
         row.prop(self, "linkedcopies")
+        row = col.row()
+        row.prop(self, "cleanup")
+
+EXPORT_OTHER_TYPES = {"CURVE", "SURFACE", "FONT", "META"}
+def getItemName(name):
+    return re.sub("_L[0-5]$", "", name)
+
+def groupExportItems(objects):
+    # Group objects by item name (without LOD suffix). Armatures are added to every item they deform.
+    items = {}
+    usedArmatures = set()
+    for obj in objects:
+        if obj.type == "ARMATURE":
+            continue
+        item = items.setdefault(getItemName(obj.name), [])
+        item.append(obj)
+        arma = obj.find_armature() or (obj.parent if obj.parent is not None and obj.parent.type == "ARMATURE" else None)
+        if arma is not None and arma in objects:
+            if arma not in item:
+                item.append(arma)
+            usedArmatures.add(arma)
+    for arma in objects:
+        if arma.type == "ARMATURE" and arma not in usedArmatures:
+            items.setdefault(getItemName(arma.name), []).append(arma)
+    return items
+
+def bulkRead(collection, attr, width = 1, dtype = np.float32):
+    data = np.empty(len(collection) * width, dtype = dtype)
+    collection.foreach_get(attr, data)
+    return data
+
+CLEANUP_MERGE_DISTANCE = 0.0001
+# looked up on the first cleanup instead of at import
+MATERIAL_POP_ARGS = None
+def getMaterialPopArgs():
+    global MATERIAL_POP_ARGS
+    if MATERIAL_POP_ARGS is None:
+        # Blender 2.80 only remaps the material indices of the faces when asked to
+        MATERIAL_POP_ARGS = {"update_data": True} if "update_data" in bpy.types.IDMaterials.bl_rna.functions["pop"].parameters else {}
+    return MATERIAL_POP_ARGS
+
+def findDuplicateVertices(co, distance):
+    # Vertices within distance of an earlier vertex which is not merged itself are merged into it, like Merge by Distance.
+    # Returns the index of the vertex each vertex is merged into.
+    targets = np.arange(len(co))
+    if len(co) < 2:
+        return targets
+    # grid with the merge distance as cell size: only vertices sharing their cell or touching an occupied neighbouring cell can merge
+    cells = np.floor(co / distance).astype(np.int64)
+    cells -= cells.min(axis = 0) - 1
+    dims = cells.max(axis = 0) + 2
+    candidates = np.ones(len(co), dtype = bool)
+    if float(dims[0]) * float(dims[1]) * float(dims[2]) < 2.0 ** 62:
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        # sorted queries keep searchsorted fast
+        order = np.argsort(keys)
+        keys = keys[order]
+        occupied, counts = np.unique(keys, return_counts = True)
+        found = np.repeat(counts > 1, counts)
+        for offset in itertools.product((-1, 0, 1), repeat = 3):
+            if offset != (0, 0, 0):
+                shifted = keys + (offset[0] * dims[1] + offset[1]) * dims[2] + offset[2]
+                found |= occupied[np.searchsorted(occupied, shifted).clip(max = len(occupied) - 1)] == shifted
+        candidates[order] = found
+    indices = np.flatnonzero(candidates)
+    tree = mathutils.kdtree.KDTree(len(indices))
+    for i in indices:
+        tree.insert(co[i], i)
+    tree.balance()
+    for i in indices:
+        if targets[i] != i:
+            continue
+        for _, j, _ in tree.find_range(co[i], distance):
+            if j > i and targets[j] == j:
+                targets[j] = i
+    return targets
+
+def getPolygonAreas(co, starts, totals, loopVerts):
+    # Vector area of every polygon, the loops of a polygon do not have to be stored in order
+    if len(totals) == 0:
+        return np.zeros(0)
+    offsets = np.cumsum(totals) - totals
+    polygons = np.repeat(np.arange(len(totals)), totals)
+    loops = np.repeat(starts - offsets, totals) + np.arange(totals.sum())
+    nextLoops = loops + 1
+    nextLoops[offsets + totals - 1] = starts
+    points = co[loopVerts[loops]]
+    origins = points[offsets][polygons]
+    cross = np.cross(points - origins, co[loopVerts[nextLoops]] - origins)
+    return 0.5 * np.linalg.norm(np.add.reduceat(cross, offsets), axis = 1)
+
+def countMeshTriangles(mesh):
+    return int((bulkRead(mesh.polygons, "loop_total", dtype = np.int32) - 2).sum())
+
+def findMeshIssues(mesh, distance = CLEANUP_MERGE_DISTANCE):
+    # Returns the merge targets of all vertices, the duplicate vertices, the faces without area once
+    # the duplicates are merged and the edges which are not used by any face
+    co = bulkRead(mesh.vertices, "co", 3).reshape(-1, 3).astype(np.float64)
+    targets = findDuplicateVertices(co, distance)
+    duplicates = np.flatnonzero(targets != np.arange(len(co)))
+    areas = getPolygonAreas(co[targets],
+                            bulkRead(mesh.polygons, "loop_start", dtype = np.int32),
+                            bulkRead(mesh.polygons, "loop_total", dtype = np.int32),
+                            bulkRead(mesh.loops, "vertex_index", dtype = np.int32))
+    degenerate = np.flatnonzero(areas <= distance * distance)
+    usedEdges = np.zeros(len(mesh.edges), dtype = bool)
+    usedEdges[bulkRead(mesh.loops, "edge_index", dtype = np.int32)] = True
+    looseEdges = np.flatnonzero(~usedEdges)
+    return targets, duplicates, degenerate, looseEdges
+
+def cleanupMesh(mesh, distance = CLEANUP_MERGE_DISTANCE):
+    # Merge duplicate vertices, remove faces without area, loose edges and unused material slots.
+    # Returns the number of removed vertices, faces, edges and material slots.
+    targets, duplicates, degenerate, looseEdges = findMeshIssues(mesh, distance)
+    facesBefore = len(mesh.polygons)
+    if len(duplicates) > 0 or len(degenerate) > 0 or len(looseEdges) > 0:
+        # only pay for the bmesh round trip if there is something to fix
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        # weld before deleting anything, deleting the loose edges also removes the vertices they leave isolated
+        if len(duplicates) > 0:
+            bmesh.ops.weld_verts(bm, targetmap = {bm.verts[i]: bm.verts[targets[i]] for i in duplicates})
+        if len(looseEdges) > 0:
+            bmesh.ops.delete(bm, geom = [e for e in bm.edges if e.is_wire], context = 'EDGES')
+        bmesh.ops.dissolve_degenerate(bm, dist = distance, edges = bm.edges[:])
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.update()
+    usedMaterials = set(np.unique(bulkRead(mesh.polygons, "material_index", dtype = np.int32)).tolist())
+    unusedSlots = [i for i in range(len(mesh.materials)) if i not in usedMaterials]
+    for index in reversed(unusedSlots):
+        mesh.materials.pop(index = index, **getMaterialPopArgs())
+    return len(duplicates), facesBefore - len(mesh.polygons), len(looseEdges), len(unusedSlots)
+
+def cleanupObjects(objects):
+    # Clean the meshes of all given objects once and return a summary for the operator report
+    start = time.perf_counter()
+    meshes = list(dict.fromkeys(o.data for o in objects if o.type == "MESH" and not o.data.is_editmode and o.data.library is None))
+    trianglesBefore = sum(countMeshTriangles(m) for m in meshes)
+    removed = [0, 0, 0, 0]
+    for mesh in meshes:
+        removed = [a + b for a, b in zip(removed, cleanupMesh(mesh))]
+    saved = trianglesBefore - sum(countMeshTriangles(m) for m in meshes)
+    return "Cleanup of {} meshes: merged {} vertices, removed {} faces, {} loose edges and {} material slots, saved {} triangles in {:.0f} ms".format(
+        len(meshes), *removed, saved, 1000.0 * (time.perf_counter() - start))
+
+def hashValue(hasher, value):
+    hasher.update(repr(value).encode())
+
+# foreach_get property and values per element of the generic attribute types, strings are only hashed by name
+ATTRIBUTE_VALUES = {
+    "FLOAT": ("value", 1), "INT": ("value", 1), "INT8": ("value", 1), "BOOLEAN": ("value", 1),
+    "FLOAT2": ("vector", 2), "INT32_2D": ("value", 2), "FLOAT_VECTOR": ("vector", 3),
+    "FLOAT_COLOR": ("color", 4), "BYTE_COLOR": ("color", 4), "QUATERNION": ("value", 4), "FLOAT4X4": ("value", 16),
+}
+
+def hashMeshData(hasher, mesh):
+    hasher.update(bulkRead(mesh.vertices, "co", 3).tobytes())
+    hasher.update(bulkRead(mesh.loops, "vertex_index", dtype = np.int32).tobytes())
+    hasher.update(bulkRead(mesh.polygons, "loop_total", dtype = np.int32).tobytes())
+    hasher.update(bulkRead(mesh.polygons, "material_index", dtype = np.int32).tobytes())
+    hasher.update(bulkRead(mesh.polygons, "use_smooth", dtype = bool).tobytes())
+    hasher.update(bulkRead(mesh.edges, "vertices", 2, dtype = np.int32).tobytes())
+    for layer in mesh.uv_layers:
+        hashValue(hasher, layer.name)
+        hasher.update(bulkRead(layer.data, "uv", 2).tobytes())
+    # sharp edges, custom split normals and auto smooth all end up in the exported normals
+    hasher.update(getLoopNormals(mesh).tobytes())
+    if hasattr(mesh, "use_auto_smooth"):
+        # Blender < 4.1
+        hashValue(hasher, (mesh.use_auto_smooth, mesh.auto_smooth_angle))
+        hasher.update(bulkRead(mesh.edges, "use_edge_sharp", dtype = bool).tobytes())
+    # color attributes, sharp edges (4.0+) and any other attributes a later export setting may pick up
+    for attribute in getattr(mesh, "attributes", ()):
+        hashValue(hasher, (attribute.name, attribute.domain, attribute.data_type))
+        prop, width = ATTRIBUTE_VALUES.get(attribute.data_type, (None, 0))
+        if prop is not None:
+            hasher.update(bulkRead(attribute.data, prop, width).tobytes())
+    if mesh.shape_keys is not None:
+        for block in mesh.shape_keys.key_blocks:
+            hashValue(hasher, (block.name, block.value, block.mute, block.relative_key.name, block.vertex_group, block.interpolation))
+            hasher.update(bulkRead(block.data, "co", 3).tobytes())
+
+def hashVertexWeights(hasher, obj, mesh):
+    hashValue(hasher, [g.name for g in obj.vertex_groups])
+    # there is no bulk API for vertex weights
+    weights = [(v.index, g.group, g.weight) for v in mesh.vertices for g in v.groups]
+    hasher.update(np.array(weights, dtype = np.float64).tobytes())
+
+def hashMaterial(hasher, material):
+    if material is None:
+        hashValue(hasher, None)
+        return
+    hashValue(hasher, (material.name, tuple(material.diffuse_color), material.use_nodes))
+    if material.node_tree is None:
+        return
+    for node in material.node_tree.nodes:
+        image = getattr(node, "image", None)
+        hashValue(hasher, (node.bl_idname, node.name, image.filepath if image is not None else None))
+        for socket in node.inputs:
+            if not socket.is_linked and hasattr(socket, "default_value"):
+                value = socket.default_value
+                hashValue(hasher, (socket.identifier, tuple(value) if hasattr(value, "__len__") else value))
+    for link in material.node_tree.links:
+        hashValue(hasher, (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier))
+
+def hashAction(hasher, action):
+    if action is None:
+        hashValue(hasher, None)
+        return
+    hashValue(hasher, (action.name, tuple(action.frame_range)))
+    for curve in action.fcurves:
+        hashValue(hasher, (curve.data_path, curve.array_index, curve.extrapolation, curve.mute))
+        for attr in ("co", "handle_left", "handle_right"):
+            hasher.update(bulkRead(curve.keyframe_points, attr, 2).tobytes())
+        hasher.update(bulkRead(curve.keyframe_points, "interpolation", dtype = np.int32).tobytes())
+
+def hashModifiers(hasher, obj):
+    # Returns False if the result of a modifier can depend on other objects
+    return all(hashModifier(hasher, mod) for mod in obj.modifiers)
+
+def hashExportObject(obj, deps):
+    # Fingerprint of everything that ends up in the FBX for this object
+    hasher = hashlib.sha1()
+    hashValue(hasher, (obj.name, obj.type, obj.parent.name if obj.parent else None, obj.parent_type, obj.parent_bone))
+    hasher.update(np.array(obj.matrix_world, dtype = np.float64).tobytes())
+    if obj.type == "MESH" and hashModifiers(hasher, obj):
+        # the original mesh and the modifier settings, the deformation by the armature at the current frame is not exported
+        hashMeshData(hasher, obj.data)
+        hashVertexWeights(hasher, obj, obj.data)
+    elif obj.type == "MESH" or obj.type in EXPORT_OTHER_TYPES:
+        # modifiers which read other objects, or no mesh data: this may cause an unneeded export, but never a stale one
+        ev = obj.evaluated_get(deps)
+        mesh = ev.to_mesh()
+        try:
+            hashMeshData(hasher, mesh)
+            hashVertexWeights(hasher, obj, mesh)
+        finally:
+            ev.to_mesh_clear()
+    if obj.type == "MESH" or obj.type in EXPORT_OTHER_TYPES:
+        for slot in obj.material_slots:
+            hashMaterial(hasher, slot.material)
+    elif obj.type == "ARMATURE":
+        for bone in obj.data.bones:
+            hashValue(hasher, (bone.name, bone.parent.name if bone.parent else None, bone.use_deform, bone.length))
+            hasher.update(np.array(bone.matrix_local, dtype = np.float64).tobytes())
+        hashAction(hasher, obj.animation_data.action if obj.animation_data else None)
+    return hasher.hexdigest()
+
+MANIFEST_VERSION = 1
+def getManifestPath(filepath):
+    return os.path.splitext(filepath)[0] + ".tmtkmanifest.json"
+
+def readManifest(filepath):
+    try:
+        with open(getManifestPath(filepath), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def writeManifest(filepath, settingsHash, itemHashes):
+    manifest = {"version": MANIFEST_VERSION, "settings": settingsHash, "items": itemHashes}
+    with open(getManifestPath(filepath), "w") as f:
+        json.dump(manifest, f, indent = 1, sort_keys = True)
+
+FBX_VERSION = 7400
+FBX_HEADER_MAGIC = b'Kaydara FBX Binary  \x00\x1a\x00'
+FBX_NULL_RECORD = b'\x00' * 13
+# fixed values the FBX SDK expects in combination with each other
+FBX_FILE_ID = b'\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1'
+FBX_CREATION_TIME = "1970-01-01 10:00:00:000"
+FBX_FOOTER_ID = b'\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e'
+FBX_FOOTER_MAGIC = b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b'
+FBX_KTIME = 46186158000
+FBX_COMPRESSION_THRESHOLD = 128
+FBX_ARRAY_TYPES = {np.dtype(np.float64): b'd', np.dtype(np.float32): b'f', np.dtype(np.int64): b'l',
+                   np.dtype(np.int32): b'i', np.dtype(np.bool_): b'b'}
+FBX_CREATOR = "TMTK Tools {}.{}.{}".format(*bl_info["version"])
+
+def fbxBool(value):
+    return b'C' + struct.pack('<?', value)
+
+def fbxInt32(value):
+    return b'I' + struct.pack('<i', value)
+
+def fbxInt64(value):
+    return b'L' + struct.pack('<q', value)
+
+def fbxDouble(value):
+    return b'D' + struct.pack('<d', value)
+
+def fbxString(value):
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return b'S' + struct.pack('<I', len(value)) + value
+
+def fbxRaw(value):
+    return b'R' + struct.pack('<I', len(value)) + value
+
+def fbxName(name, fbxClass):
+    return fbxString(name.encode("utf-8") + b'\x00\x01' + fbxClass.encode("utf-8"))
+
+def fbxArray(values, dtype):
+    data = np.ascontiguousarray(values, dtype = dtype).ravel()
+    raw = data.tobytes()
+    encoding = 0
+    if len(raw) > FBX_COMPRESSION_THRESHOLD:
+        raw = zlib.compress(raw, 1)
+        encoding = 1
+    return FBX_ARRAY_TYPES[data.dtype] + struct.pack('<III', len(data), encoding, len(raw)) + raw
+
+def fbxMatrix(matrix):
+    # FBX stores matrices column by column
+    return fbxArray(np.array(matrix, dtype = np.float64).T, np.float64)
+
+def fbxP70(name, propType, label, flags, *values):
+    return (fbxString(name), fbxString(propType), fbxString(label), fbxString(flags)) + values
+
+class FBXBinaryWriter:
+    # Streams FBX 7.4 node records to a file. The end offset of a nested node is patched once it is closed.
+    def __init__(self, f):
+        self.f = f
+
+    def writeRecordHeader(self, endOffset, name, props):
+        data = b''.join(props)
+        self.f.write(struct.pack('<IIIB', endOffset, len(props), len(data), len(name)))
+        self.f.write(name)
+        self.f.write(data)
+
+    def leaf(self, name, *props):
+        name = name.encode()
+        end = self.f.tell() + 13 + len(name) + sum(len(p) for p in props) + (0 if props else 13)
+        self.writeRecordHeader(end, name, props)
+        if not props:
+            self.f.write(FBX_NULL_RECORD)
+
+    @contextlib.contextmanager
+    def node(self, name, *props):
+        start = self.f.tell()
+        self.writeRecordHeader(0, name.encode(), props)
+        yield
+        self.f.write(FBX_NULL_RECORD)
+        end = self.f.tell()
+        self.f.seek(start)
+        self.f.write(struct.pack('<I', end))
+        self.f.seek(end)
+
+    def properties(self, *props):
+        with self.node("Properties70"):
+            for p in props:
+                self.leaf("P", *p)
+
+def getLoopNormals(mesh):
+    if hasattr(mesh, "corner_normals"):
+        # Blender 4.1+
+        return bulkRead(mesh.corner_normals, "vector", 3)
+    mesh.calc_normals_split()
+    return bulkRead(mesh.loops, "normal", 3)
+
+def getSkinClusters(obj, mesh, boneNames):
+    # Vertex indices and weights per bone, limited to MAXINFLUENCERS per vertex (there is no bulk API for weights)
+    groupNames = {g.index: g.name for g in obj.vertex_groups}
+    clusters = {}
+    for v in mesh.vertices:
+        groups = [(g.weight, g.group) for g in v.groups if g.weight > 0.0 and groupNames.get(g.group) in boneNames]
+        if len(groups) > MAXINFLUENCERS:
+            groups = sorted(groups, reverse = True)[:MAXINFLUENCERS]
+            total = sum(w for w, _ in groups)
+            groups = [(w / total, gid) for w, gid in groups]
+        for weight, gid in groups:
+            indices, weights = clusters.setdefault(groupNames[gid], ([], []))
+            indices.append(v.index)
+            weights.append(weight)
+    return clusters
+
+def getMeshExportData(obj, mesh, globalMatrix):
+    rotation = np.array(globalMatrix.to_3x3(), dtype = np.float64)
+    normalRotation = np.array(globalMatrix.to_3x3().normalized(), dtype = np.float64)
+    co = bulkRead(mesh.vertices, "co", 3).reshape(-1, 3) @ rotation.T + np.array(globalMatrix.translation)
+    loopStart = bulkRead(mesh.polygons, "loop_start", dtype = np.int32)
+    loopTotal = bulkRead(mesh.polygons, "loop_total", dtype = np.int32)
+    polygonVertexIndex = bulkRead(mesh.loops, "vertex_index", dtype = np.int32)
+    # the last index of each polygon is stored as its bitwise negation
+    ends = loopStart + loopTotal - 1
+    polygonVertexIndex[ends] = ~polygonVertexIndex[ends]
+    normals = getLoopNormals(mesh).reshape(-1, 3) @ normalRotation.T
+    return {
+        "vertices": co,
+        "polygonVertexIndex": polygonVertexIndex,
+        "normals": normals,
+        "smoothing": bulkRead(mesh.polygons, "use_smooth", dtype = bool).astype(np.int32),
+        "uvs": [(layer.name, bulkRead(layer.data, "uv", 2)) for layer in mesh.uv_layers],
+        "materialIndices": bulkRead(mesh.polygons, "material_index", dtype = np.int32),
+        "loopCount": len(mesh.loops),
+    }
+
+def bakeArmature(arma, toFBX):
+    # Sample local bone transforms (translation, euler rotation in degrees, scale) for every frame of the action
+    scene = bpy.context.scene
+    action = arma.animation_data.action
+    frames = list(range(int(action.frame_range[0]), int(action.frame_range[1]) + 1))
+    poseBones = [arma.pose.bones[b.name] for b in arma.data.bones]
+    values = np.empty((len(frames), len(poseBones), 9), dtype = np.float64)
+    previousEulers = [None] * len(poseBones)
+    originalFrame = scene.frame_current
+    try:
+        for fi, frame in enumerate(frames):
+            scene.frame_set(frame)
+            armaWorld = arma.matrix_world
+            for bi, pb in enumerate(poseBones):
+                parent = toFBX(armaWorld @ pb.parent.matrix) if pb.parent else toFBX(armaWorld)
+                local = parent.inverted_safe() @ toFBX(armaWorld @ pb.matrix)
+                loc, rot, scale = local.decompose()
+                euler = rot.to_euler('XYZ', previousEulers[bi]) if previousEulers[bi] else rot.to_euler('XYZ')
+                previousEulers[bi] = euler
+                values[fi, bi, 0:3] = loc
+                values[fi, bi, 3:6] = np.degrees(euler)
+                values[fi, bi, 6:9] = scale
+    finally:
+        scene.frame_set(originalFrame)
+    return np.array(frames), values
+
+def writeTMTKFBX(objects, filepath, keyframeTolerance = None):
+    # Lean FBX writer for the subset TMTK needs: meshes with UVs and materials,
+    # armatures with skin weights and a single baked action per armature.
+    # With a keyframeTolerance (Blender units and radians), the baked curves are reduced with reduceKeyframeValues.
+    # Uses the same conventions as the exporter settings of TMTK_OT_Exporter (-Z forward, Y up, baked space transform).
+    context = bpy.context
+    scene = context.scene
+    globalMatrix = axis_conversion(to_forward = '-Z', to_up = 'Y').to_4x4() @ Matrix.Scale(100.0 * scene.unit_settings.scale_length, 4)
+    globalMatrixInv = globalMatrix.inverted()
+    toFBX = lambda m: globalMatrix @ m @ globalMatrixInv
+    fps = scene.render.fps / scene.render.fps_base
+
+    meshObjects = [o for o in objects if o.type == "MESH" or o.type in EXPORT_OTHER_TYPES]
+    armatures = [o for o in objects if o.type == "ARMATURE"]
+    uids = itertools.count(1000000)
+    modelIds = {o: next(uids) for o in meshObjects + armatures}
+    boneIds = {(a, b.name): next(uids) for a in armatures for b in a.data.bones}
+
+    # evaluate all meshes at once, without the armature deformation of exported armatures
+    disabledMods = [m for o in meshObjects for m in o.modifiers if m.type == "ARMATURE" and m.show_viewport and m.object in armatures]
+    for mod in disabledMods:
+        mod.show_viewport = False
+    meshData = {}
+    try:
+        deps = context.evaluated_depsgraph_get()
+        for obj in meshObjects:
+            ev = obj.evaluated_get(deps)
+            mesh = ev.to_mesh()
+            try:
+                data = getMeshExportData(obj, mesh, globalMatrix)
+                arma = obj.find_armature()
+                if arma in armatures:
+                    data["armature"] = arma
+                    data["clusters"] = getSkinClusters(obj, mesh, set(arma.data.bones.keys()))
+                meshData[obj] = data
+            finally:
+                ev.to_mesh_clear()
+    finally:
+        for mod in disabledMods:
+            mod.show_viewport = True
+
+    materials = list(dict.fromkeys(slot.material for o in meshObjects for slot in o.material_slots))
+    materialIds = {m: next(uids) for m in materials}
+    baked = {a: bakeArmature(a, toFBX) for a in armatures if a.animation_data is not None and a.animation_data.action is not None}
+
+    def worldMatrix(obj):
+        return toFBX(obj.matrix_world)
+
+    def localMatrix(obj):
+        if obj.parent in modelIds:
+            return worldMatrix(obj.parent).inverted_safe() @ worldMatrix(obj)
+        return worldMatrix(obj)
+
+    def boneWorld(arma, bone):
+        return toFBX(arma.matrix_world @ bone.matrix_local)
+
+    def boneLocal(arma, bone):
+        parent = boneWorld(arma, bone.parent) if bone.parent else worldMatrix(arma)
+        return parent.inverted_safe() @ boneWorld(arma, bone)
+
+    skinned = [o for o in meshObjects if "armature" in meshData[o]]
+    boneCount = len(boneIds)
+    counts = {
+        "GlobalSettings": 1,
+        "Model": len(modelIds) + boneCount,
+        "Geometry": len(meshObjects),
+        "Material": len(materials),
+        "NodeAttribute": len(armatures) + boneCount,
+        "Deformer": sum(1 + len(meshData[o]["clusters"]) for o in skinned),
+        "Pose": 1 if skinned else 0,
+        "AnimationStack": 1 if baked else 0,
+        "AnimationLayer": 1 if baked else 0,
+        "AnimationCurveNode": sum(3 * len(a.data.bones) for a in baked),
+        "AnimationCurve": sum(9 * len(a.data.bones) for a in baked),
+    }
+    connections = []
+
+    with open(filepath, "wb") as f:
+        w = FBXBinaryWriter(f)
+        f.write(FBX_HEADER_MAGIC)
+        f.write(struct.pack('<I', FBX_VERSION))
+
+        with w.node("FBXHeaderExtension"):
+            w.leaf("FBXHeaderVersion", fbxInt32(1003))
+            w.leaf("FBXVersion", fbxInt32(FBX_VERSION))
+            w.leaf("EncryptionType", fbxInt32(0))
+            now = datetime.datetime.now()
+            with w.node("CreationTimeStamp"):
+                w.leaf("Version", fbxInt32(1000))
+                for name, value in (("Year", now.year), ("Month", now.month), ("Day", now.day), ("Hour", now.hour),
+                                    ("Minute", now.minute), ("Second", now.second), ("Millisecond", now.microsecond // 1000)):
+                    w.leaf(name, fbxInt32(value))
+            w.leaf("Creator", fbxString(FBX_CREATOR))
+        w.leaf("FileId", fbxRaw(FBX_FILE_ID))
+        w.leaf("CreationTime", fbxString(FBX_CREATION_TIME))
+        w.leaf("Creator", fbxString(FBX_CREATOR))
+
+        frameStart, frameEnd = scene.frame_start, scene.frame_end
+        if baked:
+            # like Blender's exporter, every action starts at time zero
+            frameStart = 0
+            frameEnd = max(int(frames[-1] - frames[0]) for frames, _ in baked.values())
+        ktime = lambda frame: int(round(FBX_KTIME * frame / fps))
+        with w.node("GlobalSettings"):
+            w.leaf("Version", fbxInt32(1000))
+            w.properties(
+                fbxP70("UpAxis", "int", "Integer", "", fbxInt32(1)),
+                fbxP70("UpAxisSign", "int", "Integer", "", fbxInt32(1)),
+                fbxP70("FrontAxis", "int", "Integer", "", fbxInt32(2)),
+                fbxP70("FrontAxisSign", "int", "Integer", "", fbxInt32(1)),
+                fbxP70("CoordAxis", "int", "Integer", "", fbxInt32(0)),
+                fbxP70("CoordAxisSign", "int", "Integer", "", fbxInt32(1)),
+                fbxP70("OriginalUpAxis", "int", "Integer", "", fbxInt32(-1)),
+                fbxP70("OriginalUpAxisSign", "int", "Integer", "", fbxInt32(1)),
+                fbxP70("UnitScaleFactor", "double", "Number", "", fbxDouble(1.0)),
+                fbxP70("OriginalUnitScaleFactor", "double", "Number", "", fbxDouble(1.0)),
+                fbxP70("TimeMode", "enum", "", "", fbxInt32(14)),
+                fbxP70("CustomFrameRate", "double", "Number", "", fbxDouble(fps)),
+                fbxP70("TimeSpanStart", "KTime", "Time", "", fbxInt64(ktime(frameStart))),
+                fbxP70("TimeSpanStop", "KTime", "Time", "", fbxInt64(ktime(frameEnd))),
+            )
+
+        with w.node("Documents"):
+            w.leaf("Count", fbxInt32(1))
+            with w.node("Document", fbxInt64(next(uids)), fbxString("Scene"), fbxString("Scene")):
+                w.leaf("RootNode", fbxInt64(0))
+        with w.node("References"):
+            pass
+
+        with w.node("Definitions"):
+            w.leaf("Version", fbxInt32(100))
+            w.leaf("Count", fbxInt32(sum(counts.values())))
+            for name, count in counts.items():
+                if count > 0:
+                    with w.node("ObjectType", fbxString(name)):
+                        w.leaf("Count", fbxInt32(count))
+
+        def writeModel(uid, name, modelType, matrix):
+            loc, rot, scale = matrix.decompose()
+            euler = [math.degrees(a) for a in rot.to_euler('XYZ')]
+            with w.node("Model", fbxInt64(uid), fbxName(name, "Model"), fbxString(modelType)):
+                w.leaf("Version", fbxInt32(232))
+                w.properties(
+                    fbxP70("Lcl Translation", "Lcl Translation", "", "A", *map(fbxDouble, loc)),
+                    fbxP70("Lcl Rotation", "Lcl Rotation", "", "A", *map(fbxDouble, euler)),
+                    fbxP70("Lcl Scaling", "Lcl Scaling", "", "A", *map(fbxDouble, scale)),
+                    fbxP70("DefaultAttributeIndex", "int", "Integer", "", fbxInt32(0)),
+                    fbxP70("InheritType", "enum", "", "", fbxInt32(1)),
+                )
+                w.leaf("Shading", fbxBool(True))
+                w.leaf("Culling", fbxString("CullingOff"))
+
+        def writeLayerElement(name, index, mapping, reference, dataName, data, dtype, indexName = None, indices = None, version = 101):
+            with w.node(name, fbxInt32(index)):
+                w.leaf("Version", fbxInt32(version))
+                w.leaf("Name", fbxString(""))
+                w.leaf("MappingInformationType", fbxString(mapping))
+                w.leaf("ReferenceInformationType", fbxString(reference))
+                w.leaf(dataName, fbxArray(data, dtype))
+                if indexName is not None:
+                    w.leaf(indexName, fbxArray(indices, np.int32))
+
+        with w.node("Objects"):
+            for obj in meshObjects:
+                data = meshData[obj]
+                geometryId = data["geometryId"] = next(uids)
+                with w.node("Geometry", fbxInt64(geometryId), fbxName(obj.data.name, "Geometry"), fbxString("Mesh")):
+                    w.leaf("GeometryVersion", fbxInt32(124))
+                    w.leaf("Vertices", fbxArray(data["vertices"], np.float64))
+                    w.leaf("PolygonVertexIndex", fbxArray(data["polygonVertexIndex"], np.int32))
+                    writeLayerElement("LayerElementNormal", 0, "ByPolygonVertex", "Direct", "Normals", data["normals"], np.float64)
+                    writeLayerElement("LayerElementSmoothing", 0, "ByPolygon", "Direct", "Smoothing", data["smoothing"], np.int32, version = 102)
+                    loopIndices = np.arange(data["loopCount"], dtype = np.int32)
+                    for i, (name, uv) in enumerate(data["uvs"]):
+                        with w.node("LayerElementUV", fbxInt32(i)):
+                            w.leaf("Version", fbxInt32(101))
+                            w.leaf("Name", fbxString(name))
+                            w.leaf("MappingInformationType", fbxString("ByPolygonVertex"))
+                            w.leaf("ReferenceInformationType", fbxString("IndexToDirect"))
+                            w.leaf("UV", fbxArray(uv, np.float64))
+                            w.leaf("UVIndex", fbxArray(loopIndices, np.int32))
+                    hasMaterials = len(obj.material_slots) > 0
+                    if hasMaterials:
+                        writeLayerElement("LayerElementMaterial", 0, "ByPolygon", "IndexToDirect", "Materials", data["materialIndices"], np.int32)
+                    layerTypes = ["LayerElementNormal", "LayerElementSmoothing"] + (["LayerElementUV"] if data["uvs"] else []) + \
+                                 (["LayerElementMaterial"] if hasMaterials else [])
+                    for layer in range(max(1, len(data["uvs"]))):
+                        with w.node("Layer", fbxInt32(layer)):
+                            w.leaf("Version", fbxInt32(100))
+                            for layerType in (layerTypes if layer == 0 else ["LayerElementUV"]):
+                                with w.node("LayerElement"):
+                                    w.leaf("Type", fbxString(layerType))
+                                    w.leaf("TypedIndex", fbxInt32(layer))
+                writeModel(modelIds[obj], obj.name, "Mesh", localMatrix(obj))
+                connections.append(("OO", geometryId, modelIds[obj]))
+                connections.append(("OO", modelIds[obj], modelIds.get(obj.parent, 0)))
+                for slot in obj.material_slots:
+                    connections.append(("OO", materialIds[slot.material], modelIds[obj]))
+
+            for material in materials:
+                color = material.diffuse_color if material is not None else (0.8, 0.8, 0.8)
+                with w.node("Material", fbxInt64(materialIds[material]), fbxName(material.name if material else "None", "Material"), fbxString("")):
+                    w.leaf("Version", fbxInt32(102))
+                    w.leaf("ShadingModel", fbxString("Phong"))
+                    w.leaf("MultiLayer", fbxInt32(0))
+                    w.properties(fbxP70("DiffuseColor", "Color", "", "A", *map(fbxDouble, color[:3])))
+
+            for arma in armatures:
+                attributeId = next(uids)
+                with w.node("NodeAttribute", fbxInt64(attributeId), fbxName(arma.name, "NodeAttribute"), fbxString("Null")):
+                    w.leaf("TypeFlags", fbxString("Null"))
+                writeModel(modelIds[arma], arma.name, "Null", localMatrix(arma))
+                connections.append(("OO", attributeId, modelIds[arma]))
+                connections.append(("OO", modelIds[arma], modelIds.get(arma.parent, 0)))
+                for bone in arma.data.bones:
+                    uid = boneIds[(arma, bone.name)]
+                    attributeId = next(uids)
+                    with w.node("NodeAttribute", fbxInt64(attributeId), fbxName(bone.name, "NodeAttribute"), fbxString("LimbNode")):
+                        w.leaf("TypeFlags", fbxString("Skeleton"))
+                    writeModel(uid, bone.name, "LimbNode", boneLocal(arma, bone))
+                    connections.append(("OO", attributeId, uid))
+                    connections.append(("OO", uid, boneIds[(arma, bone.parent.name)] if bone.parent else modelIds[arma]))
+
+            poseNodes = []
+            for obj in skinned:
+                data = meshData[obj]
+                arma = data["armature"]
+                skinId = next(uids)
+                with w.node("Deformer", fbxInt64(skinId), fbxName(obj.name, "Deformer"), fbxString("Skin")):
+                    w.leaf("Version", fbxInt32(101))
+                    w.leaf("Link_DeformAcuracy", fbxDouble(50.0))
+                connections.append(("OO", skinId, data["geometryId"]))
+                meshWorld = worldMatrix(obj)
+                poseNodes.append((modelIds[obj], meshWorld))
+                for boneName, (indices, weights) in data["clusters"].items():
+                    clusterId = next(uids)
+                    linkMatrix = boneWorld(arma, arma.data.bones[boneName])
+                    with w.node("Deformer", fbxInt64(clusterId), fbxName(boneName, "SubDeformer"), fbxString("Cluster")):
+                        w.leaf("Version", fbxInt32(100))
+                        w.leaf("UserData", fbxString(""), fbxString(""))
+                        w.leaf("Indexes", fbxArray(indices, np.int32))
+                        w.leaf("Weights", fbxArray(weights, np.float64))
+                        w.leaf("Transform", fbxMatrix(linkMatrix.inverted_safe() @ meshWorld))
+                        w.leaf("TransformLink", fbxMatrix(linkMatrix))
+                    connections.append(("OO", clusterId, skinId))
+                    connections.append(("OO", boneIds[(arma, boneName)], clusterId))
+            if skinned:
+                for arma in dict.fromkeys(meshData[o]["armature"] for o in skinned):
+                    poseNodes.append((modelIds[arma], worldMatrix(arma)))
+                    poseNodes += [(boneIds[(arma, b.name)], boneWorld(arma, b)) for b in arma.data.bones]
+                with w.node("Pose", fbxInt64(next(uids)), fbxName(skinned[0].name, "Pose"), fbxString("BindPose")):
+                    w.leaf("Type", fbxString("BindPose"))
+                    w.leaf("Version", fbxInt32(100))
+                    w.leaf("NbPoseNodes", fbxInt32(len(poseNodes)))
+                    for uid, matrix in poseNodes:
+                        with w.node("PoseNode"):
+                            w.leaf("Node", fbxInt64(uid))
+                            w.leaf("Matrix", fbxMatrix(matrix))
+
+            if baked:
+                stackId, layerId = next(uids), next(uids)
+                stackName = next(iter(baked)).animation_data.action.name
+                with w.node("AnimationStack", fbxInt64(stackId), fbxName(stackName, "AnimStack"), fbxString("")):
+                    w.properties(
+                        fbxP70("LocalStart", "KTime", "Time", "", fbxInt64(ktime(frameStart))),
+                        fbxP70("LocalStop", "KTime", "Time", "", fbxInt64(ktime(frameEnd))),
+                        fbxP70("ReferenceStart", "KTime", "Time", "", fbxInt64(ktime(frameStart))),
+                        fbxP70("ReferenceStop", "KTime", "Time", "", fbxInt64(ktime(frameEnd))),
+                    )
+                with w.node("AnimationLayer", fbxInt64(layerId), fbxName(stackName, "AnimLayer"), fbxString("")):
+                    pass
+                connections.append(("OO", layerId, stackId))
+                # baked translations are in FBX units (cm), rotations in degrees
+                unitScale = 100.0 * scene.unit_settings.scale_length
+                for arma, (frames, values) in baked.items():
+                    # the animation fix already scaled the bones and locations by the same factor
+                    toleranceScale = (unitScale * unitScale if isAnimationFixed(arma) else unitScale, math.degrees(1.0), 1.0)
+                    keyTimes = np.rint(FBX_KTIME * (frames - frames[0]) / fps).astype(np.int64)
+                    for bi, bone in enumerate(arma.data.bones):
+                        for ci, (channel, prop) in enumerate((("T", "Lcl Translation"), ("R", "Lcl Rotation"), ("S", "Lcl Scaling"))):
+                            curveNodeId = next(uids)
+                            channelValues = values[:, bi, 3 * ci:3 * ci + 3]
+                            with w.node("AnimationCurveNode", fbxInt64(curveNodeId), fbxName(channel, "AnimCurveNode"), fbxString("")):
+                                w.properties(*(fbxP70("d|" + axis, "Number", "", "A", fbxDouble(channelValues[0, i])) for i, axis in enumerate("XYZ")))
+                            connections.append(("OO", curveNodeId, layerId))
+                            connections.append(("OP", curveNodeId, boneIds[(arma, bone.name)], prop))
+                            for i, axis in enumerate("XYZ"):
+                                curveId = next(uids)
+                                keep = slice(None)
+                                if keyframeTolerance is not None:
+                                    keep = reduceKeyframeValues(frames.astype(np.float64), channelValues[:, i], keyframeTolerance * toleranceScale[ci])
+                                with w.node("AnimationCurve", fbxInt64(curveId), fbxName("", "AnimCurve"), fbxString("")):
+                                    w.leaf("Default", fbxDouble(channelValues[0, i]))
+                                    w.leaf("KeyVer", fbxInt32(4008))
+                                    w.leaf("KeyTime", fbxArray(keyTimes[keep], np.int64))
+                                    w.leaf("KeyValueFloat", fbxArray(channelValues[keep, i], np.float32))
+                                    # one attribute set shared by all keys: linear interpolation
+                                    w.leaf("KeyAttrFlags", fbxArray([1 << 2], np.int32))
+                                    w.leaf("KeyAttrDataFloat", fbxArray([0.0, 0.0, 9.419963346924634e-30, 0.0], np.float32))
+                                    w.leaf("KeyAttrRefCount", fbxArray([len(keyTimes[keep])], np.int32))
+                                connections.append(("OP", curveId, curveNodeId, "d|" + axis))
+
+        with w.node("Connections"):
+            for connection in connections:
+                if connection[0] == "OO":
+                    w.leaf("C", fbxString("OO"), fbxInt64(connection[1]), fbxInt64(connection[2]))
+                else:
+                    w.leaf("C", fbxString("OP"), fbxInt64(connection[1]), fbxInt64(connection[2]), fbxString(connection[3]))
+
+        # end of the top level records, followed by the footer
+        f.write(FBX_NULL_RECORD)
+        f.write(FBX_FOOTER_ID)
+        f.write(b'\x00' * 4)
+        offset = f.tell()
+        padding = ((offset + 15) & ~15) - offset
+        f.write(b'\x00' * (padding if padding > 0 else 16))
+        f.write(struct.pack('<I', FBX_VERSION))
+        f.write(b'\x00' * 120)
+        f.write(FBX_FOOTER_MAGIC)
+
+def findLayerCollections(layerCollection, collections, path = ()):
+    # The layer collections containing any of the collections and all their parents, without the scene collection
+    found = list(path) if layerCollection.collection in collections else []
+    for child in layerCollection.children:
+        found += [lc for lc in findLayerCollections(child, collections, path + (child,)) if lc not in found]
+    return found
+
+def exportObjectsToFBX(objects, filepath, exportArgs, lean = False, keyframeTolerance = None):
+    if lean:
+        writeTMTKFBX(objects, filepath, keyframeTolerance)
+        return
+    # export exactly the given objects by temporarily selecting them
+    viewLayer = bpy.context.view_layer
+    originalSelected = [o for o in viewLayer.objects if o.select_get(view_layer = viewLayer)]
+    originalActive = viewLayer.objects.active
+    for o in originalSelected:
+        o.select_set(False, view_layer = viewLayer)
+    # hidden objects can not be selected, so they and the collections hiding them are unhidden for the export
+    hidden = [(o, o.hide_get(view_layer = viewLayer), o.hide_viewport, o.hide_select) for o in objects]
+    layerCollections = findLayerCollections(viewLayer.layer_collection, {c for o in objects for c in o.users_collection})
+    hiddenCollections = [(lc, lc.hide_viewport, lc.collection.hide_viewport) for lc in layerCollections]
+    try:
+        for lc in layerCollections:
+            lc.hide_viewport = False
+            lc.collection.hide_viewport = False
+        for o in objects:
+            o.hide_set(False, view_layer = viewLayer)
+            o.hide_viewport = False
+            o.hide_select = False
+            o.select_set(True, view_layer = viewLayer)
+        # objects in excluded collections are not part of the view layer
+        missing = [o.name for o in objects if not o.select_get(view_layer = viewLayer)]
+        if len(missing) > 0:
+            raise RuntimeError("Can not export {}, objects could not be selected: {}".format(os.path.basename(filepath), ", ".join(missing)))
+        bpy.ops.export_scene.fbx(**dict(exportArgs, filepath = filepath, use_selection = True))
+    finally:
+        for o, hide, hideViewport, hideSelect in hidden:
+            o.select_set(False, view_layer = viewLayer)
+            o.hide_set(hide, view_layer = viewLayer)
+            o.hide_viewport = hideViewport
+            o.hide_select = hideSelect
+        for lc, hideLayer, hideCollection in hiddenCollections:
+            lc.hide_viewport = hideLayer
+            lc.collection.hide_viewport = hideCollection
+        for o in originalSelected:
+            o.select_set(True, view_layer = viewLayer)
+        viewLayer.objects.active = originalActive
+
+EXPORT_JOB_ARG = "--tmtk-export-job"
+EXPORT_SNAPSHOT_ARG = "--tmtk-export-snapshot"
+def launchExportWorker(snapshot, job, jobPath):
+    # Run a headless Blender instance which executes this file with the export job as argument
+    with open(jobPath, "w") as f:
+        json.dump(job, f)
+    logPath = os.path.splitext(jobPath)[0] + ".log"
+    if bpy.app.binary_path:
+        args = [bpy.app.binary_path, "-b", "--factory-startup", snapshot,
+                "--python-exit-code", "1", "--python", os.path.abspath(__file__),
+                "--", EXPORT_JOB_ARG, jobPath]
+    else:
+        # bpy built as Python module: the same interpreter runs this file, which opens the snapshot itself
+        args = [sys.executable, os.path.abspath(__file__), "--", EXPORT_JOB_ARG, jobPath, EXPORT_SNAPSHOT_ARG, snapshot]
+    with open(logPath, "w") as log:
+        proc = subprocess.Popen(args, stdout = log, stderr = subprocess.STDOUT)
+    return proc, logPath
+
+def runExportJob(jobPath):
+    # entry point of the worker processes
+    with open(jobPath, "r") as f:
+        job = json.load(f)
+    exportArgs = dict(job["exportArgs"])
+    exportArgs["object_types"] = set(exportArgs["object_types"])
+    # the worker operates on a snapshot, so neither the reduction nor the fix has to be reverted
+    if job["reduceArmatures"]:
+        _, before, after = reduceArmatureKeyframes([bpy.data.objects[name] for name in job["reduceArmatures"]], job["keyframeTolerance"])
+        print("{} {} {}".format(WORKER_KEYFRAMES_PREFIX, before, after), flush = True)
+    for name in job["fixArmatures"]:
+        processArmatureForExport(bpy.data.objects[name])
+    for entry in job["items"]:
+        if entry["objects"] is None:
+            bpy.ops.export_scene.fbx(**dict(exportArgs, filepath = entry["filepath"]))
+        else:
+            objects = [bpy.data.objects[name] for name in entry["objects"]]
+            exportObjectsToFBX(objects, entry["filepath"], exportArgs, job["lean"], job["keyframeTolerance"])
+        print("{} {}".format(WORKER_PROGRESS_PREFIX, entry["filepath"]), flush = True)
+
+def getJsonExportArgs(exportArgs):
+    return {k: (sorted(v) if isinstance(v, set) else v) for k, v in exportArgs.items()}
+
+def readLog(logPath):
+    try:
+        with open(logPath, "r", errors = "replace") as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+WORKER_PROGRESS_PREFIX = "TMTK: Exported"
+def countExportedFiles(procs):
+    return sum(len([l for l in readLog(logPath) if l.startswith(WORKER_PROGRESS_PREFIX)]) for _, logPath in procs)
+
+WORKER_KEYFRAMES_PREFIX = "TMTK: Keyframes"
+def readKeyframeCounts(procs):
+    # every worker reduces the same armatures, the first log with counts suffices
+    for _, logPath in procs:
+        for l in readLog(logPath):
+            if l.startswith(WORKER_KEYFRAMES_PREFIX):
+                before, after = l[len(WORKER_KEYFRAMES_PREFIX):].split()
+                return int(before), int(after)
+    return None
+
+def startExportWorkers(entries, exportArgs, workers, fixArmatures = (), lean = False, reduceArmatures = (), keyframeTolerance = None):
+    # Save a snapshot of the current state and let headless Blender processes write the files.
+    # entries are dicts with the target filepath and the names of the objects to export (None: use the export filters).
+    # The keyframes of reduceArmatures are reduced in the snapshot, the lean writer also reduces its baked curves.
+    tempdir = tempfile.mkdtemp(prefix = "tmtk_export_")
+    try:
+        snapshot = os.path.join(tempdir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath = snapshot, copy = True)
+        workers = max(1, min(workers, len(entries)))
+        procs = []
+        for i in range(workers):
+            job = {"exportArgs": getJsonExportArgs(exportArgs),
+                   "fixArmatures": [a.name for a in fixArmatures],
+                   "lean": lean,
+                   "reduceArmatures": [a.name for a in reduceArmatures],
+                   "keyframeTolerance": keyframeTolerance,
+                   "items": entries[i::workers]}
+            procs.append(launchExportWorker(snapshot, job, os.path.join(tempdir, "job{}.json".format(i))))
+    except Exception:
+        shutil.rmtree(tempdir, ignore_errors = True)
+        raise
+    return tempdir, procs
+
+def finishExportWorkers(tempdir, procs):
+    # Wait for the workers, clean up the snapshot and return a list of error messages
+    errors = []
+    for proc, logPath in procs:
+        if proc.wait() != 0:
+            errors.append("Worker failed: {}".format(" | ".join(l.strip() for l in readLog(logPath)[-5:])))
+    shutil.rmtree(tempdir, ignore_errors = True)
+    return errors
+
+def getExportEntries(jobs, items):
+    return [{"filepath": jobs[item], "objects": [o.name for o in items[item]]} for item in sorted(jobs)]
+
+def reduceKeyframeValues(times, values, tolerance, sampleTimes = None, sampleValues = None):
+    # Returns a mask of the keys to keep, such that linear interpolation between the kept keys
+    # stays within tolerance of every sample of the original curve (by default the keys themselves).
+    # Removes every other removable key per pass, so no two neighbouring keys are dropped based on each other.
+    if sampleTimes is None:
+        sampleTimes, sampleValues = times, values
+    keep = np.ones(len(times), dtype = bool)
+    changed = True
+    while changed:
+        changed = False
+        for parity in (0, 1):
+            kept = np.flatnonzero(keep)
+            if len(kept) <= 2:
+                return keep
+            prev, cur, nxt = kept[:-2], kept[1:-1], kept[2:]
+            t = (times[cur] - times[prev]) / (times[nxt] - times[prev])
+            predicted = values[prev] + t * (values[nxt] - values[prev])
+            candidates = (np.abs(values[cur] - predicted) <= tolerance) & (np.arange(len(cur)) % 2 == parity)
+            if not candidates.any():
+                continue
+            removed = cur[candidates]
+            trial = keep.copy()
+            trial[removed] = False
+            # verify the error of all samples per segment of the reduced curve, restore keys of failing segments
+            remaining = np.flatnonzero(trial)
+            error = np.abs(np.interp(sampleTimes, times[remaining], values[remaining]) - sampleValues)
+            segments = np.searchsorted(times[remaining], sampleTimes, side = 'right') - 1
+            # a sample on a kept key belongs to both neighbouring segments, its error is zero anyway
+            failed = np.unique(segments[error > tolerance])
+            if len(failed) > 0:
+                removedSegments = np.searchsorted(times[remaining], times[removed], side = 'right') - 1
+                trial[removed[np.isin(removedSegments, failed)]] = True
+            if (trial != keep).any():
+                keep = trial
+                changed = True
+    return keep
+
+KEYFRAME_ATTRIBUTES = (("co", 2, np.float32), ("handle_left", 2, np.float32), ("handle_right", 2, np.float32),
+                       ("interpolation", 1, np.int32), ("handle_left_type", 1, np.int32), ("handle_right_type", 1, np.int32),
+                       ("easing", 1, np.int32), ("type", 1, np.int32))
+
+def readKeyframes(fcurve):
+    return {attr: bulkRead(fcurve.keyframe_points, attr, width, dtype) for attr, width, dtype in KEYFRAME_ATTRIBUTES}
+
+def writeKeyframes(fcurve, keyframes):
+    points = fcurve.keyframe_points
+    if hasattr(points, "clear"):
+        points.clear()
+    else:
+        for i in reversed(range(len(points))):
+            points.remove(points[i], fast = True)
+    points.add(len(keyframes["co"]) // 2)
+    for attr, _, _ in KEYFRAME_ATTRIBUTES:
+        points.foreach_set(attr, keyframes[attr])
+    fcurve.update()
+
+def reduceActionKeyframes(action, tolerance, locationScale = 1.0):
+    # Remove keyframes which linear interpolation can replace within tolerance, locations use tolerance * locationScale.
+    # Returns the original keyframes of the modified fcurves for restoreActionKeyframes and the key counts.
+    linear = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items["LINEAR"].value
+    backup = []
+    before = after = 0
+    for index, fcurve in enumerate(action.fcurves):
+        keyframes = readKeyframes(fcurve)
+        co = keyframes["co"].reshape(-1, 2).astype(np.float64)
+        before += len(co)
+        # outside of the keys the reduced curve has to extrapolate the same way
+        if len(co) < 3 or len(fcurve.modifiers) > 0 or fcurve.extrapolation != "CONSTANT":
+            after += len(co)
+            continue
+        # the exporter bakes every frame, so eased and bezier segments are checked on every frame between the keys
+        sampleTimes = np.union1d(np.arange(math.ceil(co[0, 0]), math.floor(co[-1, 0]) + 1, dtype = np.float64), co[:, 0])
+        sampleValues = np.array([fcurve.evaluate(t) for t in sampleTimes])
+        curveTolerance = tolerance * locationScale if "location" in fcurve.data_path else tolerance
+        keep = reduceKeyframeValues(co[:, 0], co[:, 1], curveTolerance, sampleTimes, sampleValues)
+        after += int(keep.sum())
+        if keep.all():
+            continue
+        reduced = {attr: values.reshape(len(keep), -1)[keep].ravel() for attr, values in keyframes.items()}
+        reduced["interpolation"][:] = linear
+        writeKeyframes(fcurve, reduced)
+        backup.append((action, index, keyframes))
+    return backup, before, after
+
+def restoreActionKeyframes(backup):
+    for action, index, keyframes in backup:
+        writeKeyframes(action.fcurves[index], keyframes)
+
+def backupLocationKeyframes(armatures):
+    # Scaling the locations for the animation fix and back is not exact in single precision,
+    # restoring this backup afterwards leaves the action unchanged
+    actions = dict.fromkeys(a.animation_data.action for a in armatures if a.animation_data is not None and a.animation_data.action is not None)
+    return [(action, index, readKeyframes(fcurve)) for action in actions for index, fcurve in enumerate(action.fcurves) if "location" in fcurve.data_path]
+
+def reduceArmatureKeyframes(armatures, tolerance):
+    # reduce each action once, even if several armatures share it
+    actions = {}
+    for arma in armatures:
+        if arma.animation_data is not None and arma.animation_data.action is not None:
+            # locations of armatures fixed by the Animation Fixer are already scaled to centimeters
+            fixed = arma.get(FIXEDPROP) == True
+            actions[arma.animation_data.action] = actions.get(arma.animation_data.action, False) or fixed
+    locationScale = 100.0 * bpy.context.scene.unit_settings.scale_length
+    backup = []
+    before = after = 0
+    for action, fixed in actions.items():
+        actionBackup, actionBefore, actionAfter = reduceActionKeyframes(action, tolerance, locationScale if fixed else 1.0)
+        backup += actionBackup
+        before += actionBefore
+        after += actionAfter
+    return backup, before, after
 
 FIXEDPROP = "TMTKAnimFixed"
+# set while the exporter has applied the fix, also in the snapshots of the background exports
+EXPORT_FIXEDPROP = "TMTKAnimFixedForExport"
+def processArmatureForExport(armature: bpy.types.Object, forward = True):
+    assert(armature.type == "ARMATURE")
+    if not (armature.get(FIXEDPROP) == True or armature.animation_data == None or armature.animation_data.action == None):
+        armaAction = armature.animation_data.action
+        TMTK_OT_AnimationFixer.scaleLocationFcurves(armaAction, forward)
+        TMTK_OT_AnimationFixer.prepareArmatureForExport(armature, forward)
+        if forward:
+            armature[EXPORT_FIXEDPROP] = True
+        elif EXPORT_FIXEDPROP in armature:
+            del armature[EXPORT_FIXEDPROP]
+
+def isAnimationFixed(armature):
+    return armature.get(FIXEDPROP) == True or armature.get(EXPORT_FIXEDPROP) == True
+
 USE_VISIBLE_AVAILABLE = (VERSION[0] > 3 or (VERSION[0] >= 3 and VERSION[1] >= 2))
 class TMTK_OT_Exporter(bpy.types.Operator):
     bl_idname = "tmtk.tmtkexporter"
@@ -137,6 +1226,22 @@ class TMTK_OT_Exporter(bpy.types.Operator):
                                         description="Enable this if you intend to edit the armature from exported data")
     exportOther: bpy.props.BoolProperty(name="Export objects of type 'OTHER'", default = True,
                                         description="This includes curves and text objects, but not lights, cameras or empties")
+    incremental: bpy.props.BoolProperty(name="Skip unchanged export", default = False,
+                                        description="Store a manifest next to the FBX file and skip the export if nothing relevant changed since the last one")
+    splitItems: bpy.props.BoolProperty(name="One FBX per item", default = False,
+                                        description="Write a separate FBX file for each item (objects with the same name apart from the _L0-_L5 suffix) into the chosen folder")
+    parallelWorkers: bpy.props.IntProperty(name="Worker processes", default = 0, min = 0, max = 16,
+                                        description="Number of background Blender processes writing the files of 'One FBX per item' in parallel (0: export in this process)")
+    background: bpy.props.BoolProperty(name="Export in background", default = False,
+                                        description="Write the FBX from a snapshot in a separate Blender process so you can keep working. The animation fix is only applied to the snapshot")
+    leanWriter: bpy.props.BoolProperty(name="Use lean TMTK writer (experimental)", default = False,
+                                        description="Write meshes, armatures and their active action with the addon's own FBX writer instead of Blender's exporter. Faster, but limited to what TMTK needs (ignores 'Add Leaf Bones')")
+    cleanup: bpy.props.BoolProperty(name="Clean up meshes", default = False,
+                                        description="Merge duplicate vertices and remove faces without area, loose edges and unused material slots of the exported meshes before exporting. This modifies the meshes")
+    reduceKeyframes: bpy.props.BoolProperty(name="Reduce keyframes", default = False,
+                                        description="Temporarily remove keyframes which linear interpolation between their neighbours reproduces within the tolerance. Only the lean writer writes fewer keys, Blender's exporter bakes every frame of the reduced curves")
+    keyframeTolerance: bpy.props.FloatProperty(name="Keyframe tolerance", default = 0.001, min = 0.0, max = 1.0, precision = 4,
+                                        description="Maximum deviation of a reduced curve from the original keys (Blender units for locations, radians for rotations)")
 
     @classmethod
     def poll(cls, context):
@@ -151,19 +1256,105 @@ class TMTK_OT_Exporter(bpy.types.Operator):
         armaTargets = [a for a in armatures if armafilter(a)]
         return armaTargets
 
+    def getExportObjects(self, context):
+        # mirrors the object filters of the FBX exporter
+        types = {"ARMATURE", "MESH"} | (EXPORT_OTHER_TYPES if self.exportOther else set())
+        viewLayer = bpy.context.view_layer
+        objects = [o for o in viewLayer.objects if o.type in types]
+        if (self.onlySelected):
+            objects = [o for o in objects if o.select_get(view_layer = viewLayer)]
+        if (USE_VISIBLE_AVAILABLE and self.onlyVisible):
+            objects = [o for o in objects if o.visible_get(view_layer = viewLayer)]
+        return objects
+
+    def getItemHashes(self, context, objects):
+        deps = bpy.context.evaluated_depsgraph_get()
+        objectHashes = {o.name: hashExportObject(o, deps) for o in objects}
+        itemHashes = {}
+        for item, itemObjects in groupExportItems(objects).items():
+            hasher = hashlib.sha1()
+            for name in sorted(o.name for o in itemObjects):
+                hashValue(hasher, (name, objectHashes[name]))
+            itemHashes[item] = hasher.hexdigest()
+        return itemHashes
+
+    def getSettingsHash(self, exportArgs):
+        settings = {k: (sorted(v) if isinstance(v, set) else v) for k, v in exportArgs.items() if k != "filepath"}
+        scene = bpy.context.scene
+        settings["applyAnimationFix"] = self.applyAnimationFix
+        settings["unitScale"] = scene.unit_settings.scale_length
+        settings["fps"] = (scene.render.fps, scene.render.fps_base)
+        settings["frameRange"] = (scene.frame_start, scene.frame_end)
+        settings["addonVersion"] = bl_info["version"]
+        settings["leanWriter"] = self.leanWriter
+        settings["keyframeTolerance"] = self.getKeyframeTolerance()
+        return hashlib.sha1(json.dumps(settings, sort_keys = True).encode()).hexdigest()
+
     def processArmature(self, context, armature: bpy.types.Object, forward = True):
-        assert(armature.type == "ARMATURE")
-        if not (armature.get(FIXEDPROP) == True or armature.animation_data == None or armature.animation_data.action == None):
-            armaAction = armature.animation_data.action
-            TMTK_OT_AnimationFixer.scaleLocationFcurves(armaAction, forward)
-            TMTK_OT_AnimationFixer.prepareArmatureForExport(armature, forward)
+        processArmatureForExport(armature, forward)
+
+    def getKeyframeTolerance(self):
+        return self.keyframeTolerance if self.reduceKeyframes else None
+
+    def reduceArmatures(self, armatures):
+        # Runs before the animation fix, so the tolerance is in Blender units. Returns the backup for restoreActionKeyframes.
+        if not self.reduceKeyframes:
+            return []
+        backup, before, after = reduceArmatureKeyframes(armatures, self.keyframeTolerance)
+        self._keyframeInfo = self.getKeyframeInfo(before, after)
+        return backup
+
+    def getKeyframeInfo(self, before, after):
+        # the counts are keys of the Blender actions, only the lean writer also reduces the keys it writes
+        if self.leanWriter:
+            return " (action keyframes reduced from {} to {})".format(before, after)
+        return " (action keyframes reduced from {} to {}, Blender's exporter still bakes every frame)".format(before, after)
+
+    def startBackgroundExport(self, context, entries, exportArgs, fixArmatures, manifests, reduceArmatures = ()):
+        # The export runs on a snapshot in a separate Blender process, so the scene is never modified.
+        # manifests are (filepath, settingsHash, itemHashes) tuples which are written once the export succeeded.
+        self._tempdir, self._procs = startExportWorkers(entries, exportArgs, self.parallelWorkers, fixArmatures, self.leanWriter,
+                                                        reduceArmatures, self.getKeyframeTolerance())
+        self._manifests = manifests
+        self._filepaths = [e["filepath"] for e in entries]
+        self._fileCount = len(entries)
+        if context.window is None:
+            # no UI to keep responsive, e.g. when running with blender -b
+            return self.finishBackgroundExport(context)
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.5, window = context.window)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, "Started FBX export in background")
+        return {'RUNNING_MODAL'}
 
-    def execute(self, context):
-        if (len(os.path.basename(self.filepath)) == 0):
-            self.report({'WARNING'}, 'Cancelled FBX Export: Empty filename not allowed')
+    def finishBackgroundExport(self, context):
+        # the logs are removed together with the snapshot
+        keyframeCounts = readKeyframeCounts(self._procs)
+        keyframeInfo = self.getKeyframeInfo(*keyframeCounts) if keyframeCounts is not None else ""
+        errors = finishExportWorkers(self._tempdir, self._procs)
+        if len(errors) > 0:
+            self.report({'ERROR'}, "FBX export failed: {}".format("; ".join(errors)))
             return {'CANCELLED'}
-        if not (self.filepath.lower().endswith(".fbx")):
-            self.filepath = self.filepath + ".fbx"
+        for manifest in self._manifests:
+            writeManifest(*manifest)
+        if self._fileCount == 1:
+            self.report({'INFO'}, "Exported FBX to {}{}".format(self._filepaths[0], keyframeInfo))
+        else:
+            self.report({'INFO'}, "Exported {} FBX files to {}{}".format(self._fileCount, os.path.dirname(self._filepaths[0]), keyframeInfo))
+        return {'FINISHED'}
+
+    def modal(self, context, event):
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        if any(proc.poll() is None for proc, _ in self._procs):
+            context.workspace.status_text_set("TMTK: Exporting FBX in background ({}/{} files written)"
+                                              .format(countExportedFiles(self._procs), self._fileCount))
+            return {'PASS_THROUGH'}
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+        return self.finishBackgroundExport(context)
+
+    def getExportArgs(self):
         exportArgs = {"filepath": self.filepath,
         "object_types": {"ARMATURE","MESH", "OTHER"} if self.exportOther else {"ARMATURE","MESH"},
         "bake_space_transform": True,
@@ -172,16 +1363,141 @@ class TMTK_OT_Exporter(bpy.types.Operator):
         "add_leaf_bones": self.addLeafBones}
         if (USE_VISIBLE_AVAILABLE):
             exportArgs["use_visible"] = self.onlyVisible
-        if (self.applyAnimationFix):
-            armatures = self.getArmatures(context)
+        return exportArgs
+
+    def executeSplit(self, context, exportArgs):
+        directory = os.path.dirname(os.path.abspath(bpy.path.abspath(self.filepath)))
+        objects = self.getExportObjects(context)
+        items = groupExportItems(objects)
+        if len(items) == 0:
+            self.report({'WARNING'}, 'Cancelled FBX Export: No objects to export')
+            return {'CANCELLED'}
+        # objects are already filtered, each file contains exactly the objects of its item
+        itemArgs = dict(exportArgs, use_selection = True)
+        if (USE_VISIBLE_AVAILABLE):
+            itemArgs["use_visible"] = False
+        jobs = {item: os.path.join(directory, bpy.path.clean_name(item) + ".fbx") for item in items}
+        # e.g. "A.B" and "A_B" both become A_B.fbx, file names are compared case-insensitively for Windows
+        targets = {}
+        for item in sorted(jobs):
+            targets.setdefault(jobs[item].lower(), []).append(item)
+        collisions = [" and ".join(names) for names in targets.values() if len(names) > 1]
+        if len(collisions) > 0:
+            self.report({'ERROR'}, "Cancelled FBX Export: Items would overwrite each other's file: {}".format("; ".join(collisions)))
+            return {'CANCELLED'}
+
+        if (self.incremental):
+            itemHashes = self.getItemHashes(context, objects)
+            settingsHash = self.getSettingsHash(itemArgs)
+            for item in list(jobs.keys()):
+                manifest = readManifest(jobs[item])
+                if manifest is not None and manifest["settings"] == settingsHash and \
+                    manifest["items"] == {item: itemHashes[item]} and os.path.isfile(jobs[item]):
+                    del jobs[item]
+        skipped = len(items) - len(jobs)
+        if len(jobs) == 0:
+            self.report({'INFO'}, "Skipped FBX export: None of the {} items changed since the last export".format(len(items)))
+            return {'FINISHED'}
+
+        # each armature is fixed and reduced once for the whole run instead of once per file
+        itemArmatures = list(dict.fromkeys(o for item in jobs for o in items[item] if o.type == "ARMATURE"))
+        armatures = itemArmatures if self.applyAnimationFix else []
+        reduceArmatures = itemArmatures if self.reduceKeyframes else []
+        if (self.background):
+            manifests = [(jobs[item], settingsHash, {item: itemHashes[item]}) for item in sorted(jobs)] if self.incremental else []
+            return self.startBackgroundExport(context, getExportEntries(jobs, items), itemArgs, armatures, manifests, reduceArmatures)
+        keyframeBackup = self.reduceArmatures(reduceArmatures)
+        locationBackup = backupLocationKeyframes(armatures)
+        for arma in armatures:
+            self.processArmature(context, arma)
+        errors = []
+        try:
+            if self.parallelWorkers > 0 and len(jobs) > 1:
+                self.report({'INFO'}, "Started FBX export of {} items in {} worker processes".format(len(jobs), min(self.parallelWorkers, len(jobs))))
+                errors = finishExportWorkers(*startExportWorkers(getExportEntries(jobs, items), itemArgs, self.parallelWorkers, lean = self.leanWriter,
+                                                                 keyframeTolerance = self.getKeyframeTolerance()))
+            else:
+                wm = context.window_manager
+                wm.progress_begin(0, len(jobs))
+                try:
+                    for i, item in enumerate(sorted(jobs)):
+                        # one item which can not be exported does not stop the others
+                        try:
+                            exportObjectsToFBX(items[item], jobs[item], itemArgs, self.leanWriter, self.getKeyframeTolerance())
+                        except RuntimeError as e:
+                            errors.append(str(e))
+                        wm.progress_update(i + 1)
+                finally:
+                    wm.progress_end()
+        finally:
             for arma in armatures:
-                self.processArmature(context, arma)
+                self.processArmature(context, arma, forward = False)
+            restoreActionKeyframes(locationBackup)
+            restoreActionKeyframes(keyframeBackup)
+
+        if len(errors) > 0:
+            self.report({'ERROR'}, "FBX export failed: {}".format("; ".join(errors)))
+            return {'CANCELLED'}
+        if (self.incremental):
+            for item in jobs:
+                writeManifest(jobs[item], settingsHash, {item: itemHashes[item]})
+        skippedInfo = " ({} unchanged items skipped)".format(skipped) if skipped > 0 else ""
+        self.report({'INFO'}, "Exported {} FBX files to {}{}{}".format(len(jobs), directory, skippedInfo, self._keyframeInfo))
+        return {'FINISHED'}
+
+    def execute(self, context):
+        if (len(os.path.basename(self.filepath)) == 0) and not self.splitItems:
+            self.report({'WARNING'}, 'Cancelled FBX Export: Empty filename not allowed')
+            return {'CANCELLED'}
+        if not (self.filepath.lower().endswith(".fbx")) and not self.splitItems:
+            self.filepath = self.filepath + ".fbx"
+        exportArgs = self.getExportArgs()
+        self._keyframeInfo = ""
+        if (self.cleanup):
+            # before hashing, so an incremental export only sees the cleaned meshes
+            self.report({'INFO'}, cleanupObjects(self.getExportObjects(context)))
+        if (self.splitItems):
+            return self.executeSplit(context, exportArgs)
+        changedInfo = ""
+        if (self.incremental):
+            # hash before the animation fix touches the armatures
+            itemHashes = self.getItemHashes(context, self.getExportObjects(context))
+            settingsHash = self.getSettingsHash(exportArgs)
+            manifest = readManifest(self.filepath)
+            if manifest is not None and manifest["settings"] == settingsHash and os.path.isfile(self.filepath):
+                oldHashes = manifest["items"]
+                changed = sorted(item for item, h in itemHashes.items() if oldHashes.get(item) != h)
+                removed = sorted(item for item in oldHashes if item not in itemHashes)
+                if len(changed) == 0 and len(removed) == 0:
+                    self.report({'INFO'}, "Skipped FBX export: Nothing changed since last export to {}".format(self.filepath))
+                    return {'FINISHED'}
+                changedInfo = " (changed items: {})".format(", ".join(changed + removed))
+        if (self.background):
+            manifests = [(self.filepath, settingsHash, itemHashes)] if self.incremental else []
+            # the lean writer needs the object list, Blender's exporter applies the filters itself
+            objectNames = [o.name for o in self.getExportObjects(context)] if self.leanWriter else None
+            entries = [{"filepath": self.filepath, "objects": objectNames}]
+            return self.startBackgroundExport(context, entries, exportArgs, self.getArmatures(context) if self.applyAnimationFix else [], manifests,
+                                              self.getArmatures(context) if self.reduceKeyframes else [])
+        keyframeBackup = self.reduceArmatures(self.getArmatures(context))
+        armatures = self.getArmatures(context) if self.applyAnimationFix else []
+        locationBackup = backupLocationKeyframes(armatures)
+        for arma in armatures:
+            self.processArmature(context, arma)
         self.report({'INFO'}, "Started FBX export")
-        bpy.ops.export_scene.fbx(**exportArgs)
-        if (self.applyAnimationFix):
+        try:
+            if (self.leanWriter):
+                writeTMTKFBX(self.getExportObjects(context), self.filepath, self.getKeyframeTolerance())
+            else:
+                bpy.ops.export_scene.fbx(**exportArgs)
+        finally:
             for arma in armatures:
                 self.processArmature(context, arma, forward = False)
-        self.report({'INFO'}, "Exported FBX to {}".format(self.filepath))
+            restoreActionKeyframes(locationBackup)
+            restoreActionKeyframes(keyframeBackup)
+        if (self.incremental):
+            writeManifest(self.filepath, settingsHash, itemHashes)
+        self.report({'INFO'}, "Exported FBX to {}{}{}".format(self.filepath, changedInfo, self._keyframeInfo))
         return {'FINISHED'}
 
 
@@ -260,6 +1576,24 @@ class TMTK_OT_AnimationFixer(bpy.types.Operator):
 
 MAXINFLUENCERS = 4
 PRECISION = 12
+
+def getSegmentStarts(keys):
+    # start indices of the runs of equal values in a sorted array
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+def addWeightsGrouped(groups, vertices, groupIndices, weights):
+    # one VertexGroup.add call per (group, weight) pair
+    if len(vertices) == 0:
+        return
+    keys, inverse = np.unique(np.column_stack((groupIndices, weights)), axis = 0, return_inverse = True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind = "stable")
+    for (group, weight), indices in zip(keys, np.split(vertices[order], np.cumsum(np.bincount(inverse))[:-1])):
+        groups[int(group)].add(indices.tolist(), float(weight), 'REPLACE')
+
+def removeWeightsGrouped(groups, vertices, groupIndices):
+    for group in np.unique(groupIndices):
+        groups[int(group)].remove(vertices[groupIndices == group].tolist())
 class TMTK_OT_NormalizeWeights(bpy.types.Operator):
     bl_idname = "tmtk.tmtknormalizeoperator"
     bl_label = "TMTK: Normalize Bone Weights"
@@ -269,6 +1603,8 @@ class TMTK_OT_NormalizeWeights(bpy.types.Operator):
                                         description="Do not check whether vertices are already normalized")
     applyMods: bpy.props.BoolProperty(name="Apply Modifiers", default = False,
                                         description="Permanently apply modifier stack before normalizing (except armature)")
+    transferToLODs: bpy.props.BoolProperty(name="Transfer from L0 to LODs", default = False,
+                                        description="Normalize only the L0 of each selected item and copy the weights of the nearest L0 vertex to every vertex of its LODs L1-L5")
 
     @classmethod
     def poll(cls, context):
@@ -286,9 +1622,62 @@ class TMTK_OT_NormalizeWeights(bpy.types.Operator):
 
         mods = [mod for mod in obj.modifiers if mod.type != "ARMATURE"]
         for mod in mods:
-            bpy.ops.object.modifier_apply({'object': obj}, modifier = mod.name)
+            if CONTEXT_TEMP_OVERWRITE_API:
+                from bpy import context
+                context_override = context.copy()
+                context_override['object'] = obj
+                with context.temp_override(**context_override):
+                    bpy.ops.object.modifier_apply(modifier = mod.name)
+            else:
+                bpy.ops.object.modifier_apply({'object': obj}, modifier = mod.name)
+
+    def fixWeightsChunked(self, obj, blockSize):
+        # Same rules as fixWeights, vectorized over blocks of blockSize vertices
+        groups = obj.vertex_groups
+        vertices = obj.data.vertices
+        fixedVerts = 0
+        for start in range(0, len(vertices), blockSize):
+            # there is no bulk API for vertex weights
+            entries = np.array([(v.index, g.group, g.weight) for v in vertices[start:start + blockSize] for g in v.groups], dtype = np.float64)
+            if len(entries) == 0:
+                continue
+            vertex = entries[:, 0].astype(np.int64)
+            group = entries[:, 1].astype(np.int64)
+            weight = entries[:, 2]
+
+            # rank of each weight within its vertex, ties keep the group order like sorted() does
+            order = np.lexsort((np.arange(len(vertex)), -weight, vertex))
+            starts = getSegmentStarts(vertex[order])
+            rank = np.empty(len(vertex), dtype = np.int64)
+            rank[order] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+            kept = rank < MAXINFLUENCERS
+            removeWeightsGrouped(groups, vertex[~kept], group[~kept])
+            vertex, group, weight = vertex[kept], group[kept], weight[kept]
+
+            starts = getSegmentStarts(vertex)
+            wsum = np.repeat(np.add.reduceat(weight, starts), np.diff(np.r_[starts, len(vertex)]))
+            fix = (wsum != 0.0) & ((wsum != 1.0) | self.forceAll)
+            fixedVerts += int(np.count_nonzero(fix[starts]))
+            vertex, group, weight, wsum = vertex[fix], group[fix], weight[fix], wsum[fix]
+            if len(vertex) == 0:
+                continue
+
+            weight = np.trunc(weight / wsum * 2**PRECISION) * 2**(-PRECISION)
+            # the largest weight of each vertex takes the rounding error
+            order = np.lexsort((np.arange(len(vertex)), -weight, vertex))
+            top = order[getSegmentStarts(vertex[order])]
+            starts = getSegmentStarts(vertex)
+            weight[top] = 1.0 - (np.add.reduceat(weight, starts) - weight[top])
+
+            zero = weight == 0
+            removeWeightsGrouped(groups, vertex[zero], group[zero])
+            addWeightsGrouped(groups, vertex[~zero], group[~zero], weight[~zero])
+        return fixedVerts
 
     def fixWeights(self, obj):
+        blockSize = getBlockSize(WEIGHT_BYTES_PER_VERTEX)
+        if blockSize is not None:
+            return self.fixWeightsChunked(obj, blockSize)
         fixedVerts = 0
         for v in obj.data.vertices:
             index = v.index
@@ -323,11 +1712,69 @@ class TMTK_OT_NormalizeWeights(bpy.types.Operator):
 
         return fixedVerts
 
+    def getWorldCoordinates(self, obj):
+        co = bulkRead(obj.data.vertices, "co", 3).reshape(-1, 3).astype(np.float64)
+        matrix = np.array(obj.matrix_world)
+        return co @ matrix[:3, :3].T + matrix[:3, 3]
+
+    def transferWeights(self, source, sourceWeights, kd, target):
+        # Replace the vertex groups of target with the weights of the nearest source vertex
+        target.vertex_groups.clear()
+        groups = [target.vertex_groups.new(name = g.name) for g in source.vertex_groups]
+        # collect the target vertices per (group, weight) pair, so each pair takes a single call
+        assignments = {}
+        for index, co in enumerate(self.getWorldCoordinates(target)):
+            _, nearest, _ = kd.find(co)
+            for group, weight in sourceWeights[nearest]:
+                assignments.setdefault((group, weight), []).append(index)
+        for (group, weight), indices in assignments.items():
+            groups[group].add(indices, weight, 'REPLACE')
+
+    def executeTransfer(self, context, selection, peakBefore):
+        foundUnapplied = False
+        fixedVerts = 0
+        lodCount = 0
+        items = list(dict.fromkeys(getItemName(o.name) for o in selection))
+        missing = []
+        for item in items:
+            source = bpy.data.objects.get(item + "_L0")
+            if source is None or source.type != "MESH":
+                missing.append(item)
+                continue
+            lods = [bpy.data.objects.get("{}_L{}".format(item, i)) for i in range(1, 6)]
+            # LODs which share the mesh of L0 already have its weights
+            lods = [lod for lod in lods if lod is not None and lod.type == "MESH" and lod.data != source.data]
+            if (self.applyMods):
+                for obj in [source] + lods:
+                    self.applyModifiers(obj)
+            if len([m for m in source.modifiers if m.type != "ARMATURE"]) > 0:
+                foundUnapplied = True
+            fixedVerts += self.fixWeights(source)
+            if len(lods) == 0:
+                continue
+            sourceCo = self.getWorldCoordinates(source)
+            kd = mathutils.kdtree.KDTree(len(sourceCo))
+            for index, co in enumerate(sourceCo):
+                kd.insert(co, index)
+            kd.balance()
+            sourceWeights = [[(g.group, g.weight) for g in v.groups] for v in source.data.vertices]
+            for lod in lods:
+                self.transferWeights(source, sourceWeights, kd, lod)
+            lodCount += len(lods)
+        warning = " Warning: At least one L0 had unapplied modifiers." if foundUnapplied else ""
+        if len(missing) > 0:
+            warning += " No L0 found for: {}.".format(", ".join(missing))
+        self.report({'INFO'}, "Adjusted weights of {} vertices and transferred them to {} LODs.{}{}".format(fixedVerts, lodCount, warning, getMemoryInfo(peakBefore)))
+        return {'FINISHED'}
+
     def execute(self, context):
+        peakBefore = getPeakMemory()
         foundUnapplied = False
         fixedVerts = 0
         warning = " Warning: At least one object had unapplied modifiers."
         selection = bpy.context.selected_objects
+        if (self.transferToLODs):
+            return self.executeTransfer(context, [o for o in selection if o.type == "MESH"], peakBefore)
         for o in selection:
             if (o.type != "MESH"):
                 continue
@@ -338,7 +1785,7 @@ class TMTK_OT_NormalizeWeights(bpy.types.Operator):
             fixedVerts += self.fixWeights(o)
         if not (foundUnapplied):
             warning = ""
-        self.report({'INFO'}, "Adjusted weights of {} vertices.{}".format(fixedVerts, warning))
+        self.report({'INFO'}, "Adjusted weights of {} vertices.{}{}".format(fixedVerts, warning, getMemoryInfo(peakBefore)))
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -352,12 +1799,318 @@ class TMTK_OT_NormalizeWeights(bpy.types.Operator):
         row = col.row()
         row.prop(self, "forceAll")
         row.prop(self, "applyMods")
+        row = col.row()
+        row.prop(self, "transferToLODs")
 
 
-ICONS_AVAILABLE = bpy.types.UILayout.bl_rna.functions["prop"].parameters["icon"].enum_items.keys()
-OKICON = "CHECKMARK" if "CHECKMARK" in ICONS_AVAILABLE else "CHECKBOX_HLT"
-NOTOKICON = "ERROR" if "CHECKMARK" in ICONS_AVAILABLE else "CHECKBOX_DEHLT"
+class TMTKToolsPreferences(bpy.types.AddonPreferences):
+    bl_idname = __name__
+    textureFolder: bpy.props.StringProperty(name="Texture folder", subtype = "DIR_PATH",
+                                            description="Folder which is searched for the texture files of your materials, in addition to the folder of the .blend file")
+    chunkedProcessing: bpy.props.BoolProperty(name="Chunked processing", default = False,
+                                            description="Read and normalize vertex weights in blocks of vertices to limit the memory used for very large meshes. "
+                                                        "Triangle counts then skip building the triangulation")
+    memoryCap: bpy.props.IntProperty(name="Block memory (MB)", default = 256, min = 16, max = 65536,
+                                            description="Estimated working memory per block, used to choose the number of vertices in a block")
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "textureFolder")
+        row = layout.row()
+        row.prop(self, "chunkedProcessing")
+        sub = row.row()
+        sub.prop(self, "memoryCap")
+        sub.enabled = self.chunkedProcessing
+
+def getPreferences():
+    # None if the addon is not installed, e.g. when run from the text editor
+    addon = bpy.context.preferences.addons.get(__name__)
+    return addon.preferences if addon is not None else None
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+DDS_FOURCC_CHANNELS = {b'DXT1': 3, b'DXT3': 4, b'DXT5': 4, b'ATI1': 1, b'BC4U': 1, b'ATI2': 2, b'BC5U': 2}
+# DXGI formats of the DX10 header extension (BC1-BC7 and common uncompressed formats)
+DDS_DXGI_CHANNELS = {28: 4, 29: 4, 71: 3, 72: 3, 74: 4, 75: 4, 77: 4, 78: 4, 80: 1, 81: 1, 83: 2, 84: 2,
+                     87: 4, 91: 4, 95: 3, 96: 3, 98: 4, 99: 4}
+TGA_IMAGE_TYPES = {1, 2, 3, 9, 10, 11}
+
+def readImageHeader(filepath):
+    # Read the dimensions and the number of channels of a PNG, DDS or TGA file without loading the image.
+    # Returns a (width, height, channels) tuple, channels is None if the format does not tell.
+    with open(filepath, "rb") as f:
+        header = f.read(148)
+    if header.startswith(PNG_SIGNATURE):
+        if header[12:16] != b'IHDR':
+            raise ValueError("PNG without IHDR chunk")
+        width, height, _, colorType = struct.unpack('>IIBB', header[16:26])
+        return width, height, PNG_CHANNELS.get(colorType)
+    if header.startswith(b'DDS '):
+        height, width = struct.unpack('<II', header[12:20])
+        flags, fourCC = struct.unpack('<I4s', header[80:88])
+        if fourCC == b'DX10':
+            return width, height, DDS_DXGI_CHANNELS.get(struct.unpack('<I', header[128:132])[0])
+        if flags & 0x4:
+            return width, height, DDS_FOURCC_CHANNELS.get(fourCC)
+        masks = struct.unpack('<IIII', header[92:108])
+        return width, height, len([m for m in masks[:3] if m != 0]) + (1 if flags & 0x1 and masks[3] != 0 else 0)
+    if filepath.lower().endswith(".tga") and len(header) >= 18 and header[2] in TGA_IMAGE_TYPES:
+        width, height, depth, descriptor = struct.unpack('<HHBB', header[12:18])
+        if header[2] in (3, 11):
+            return width, height, 1
+        alphaBits = descriptor & 0x0F
+        return width, height, (4 if alphaBits > 0 else 3) if depth in (16, 32) else (3 if depth == 24 else None)
+    raise ValueError("Unknown image format")
+
+TEXTURE_HEADER_CACHE = {}
+def getTextureInfo(filepath):
+    # Cached by modification time, so repeated checks only cost a stat call per file
+    try:
+        mtime = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
+    cached = TEXTURE_HEADER_CACHE.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        info = readImageHeader(filepath)
+    except (OSError, ValueError, struct.error) as e:
+        info = str(e)
+    TEXTURE_HEADER_CACHE[filepath] = (mtime, info)
+    return info
+
+TEXTURE_EXTENSIONS = (".png", ".dds", ".tga")
+# suffix and allowed channel counts of the texture files TMTK expects per material
+TEXTURE_TYPES = (("_BC", (3, 4)), ("_NM", (3, 4)))
+
+def getTextureFolders():
+    folders = []
+    if bpy.data.filepath:
+        folders.append(os.path.dirname(bpy.path.abspath(bpy.data.filepath)))
+    preferences = getPreferences()
+    if preferences is not None and preferences.textureFolder:
+        folders.append(os.path.normpath(bpy.path.abspath(preferences.textureFolder)))
+    return list(dict.fromkeys(folders))
+
+def isPowerOfTwo(value):
+    return value > 0 and (value & (value - 1)) == 0
+
+def validateMaterialTextures(material, folders):
+    # Returns a (texture name, found file, list of problems) tuple for each expected texture of the material
+    results = []
+    for suffix, channelCounts in TEXTURE_TYPES:
+        name = material + suffix
+        candidates = [os.path.join(folder, name + ext) for folder in folders for ext in TEXTURE_EXTENSIONS]
+        found = next(((path, info) for path, info in ((p, getTextureInfo(p)) for p in candidates) if info is not None), None)
+        if found is None:
+            results.append((name, None, ["not found"]))
+            continue
+        path, info = found
+        if isinstance(info, str):
+            results.append((name, path, ["unreadable: {}".format(info)]))
+            continue
+        width, height, channels = info
+        problems = []
+        if not (isPowerOfTwo(width) and isPowerOfTwo(height)):
+            problems.append("{}x{} is not a power of two".format(width, height))
+        if channels is not None and channels not in channelCounts:
+            problems.append("has {} channels, expected {}".format(channels, " or ".join(str(c) for c in channelCounts)))
+        results.append((name, path, problems))
+    return results
+
+ICONS_AVAILABLE = None
+def getAvailableIcons():
+    # the icon enum is only looked up once the hints are drawn for the first time
+    global ICONS_AVAILABLE
+    if ICONS_AVAILABLE is None:
+        ICONS_AVAILABLE = set(bpy.types.UILayout.bl_rna.functions["prop"].parameters["icon"].enum_items.keys())
+    return ICONS_AVAILABLE
+
+def getHintIcons():
+    icons = getAvailableIcons()
+    okicon = "CHECKMARK" if "CHECKMARK" in icons else "CHECKBOX_HLT"
+    notokicon = "ERROR" if "CHECKMARK" in icons else "CHECKBOX_DEHLT"
+    return okicon, notokicon
 HINTS_SUPPORTED_TYPES = ["MESH", "FONT", "CURVE"]
+
+# Triangle counts and bounds of mesh objects are stored in the object together with a fingerprint of the
+# mesh topology, the modifier stack and, with modifiers, the vertex positions. The cached values are used as long as the fingerprint matches.
+HINTS_CACHE_PROP = "TMTKHintsCache"
+HINTS_CACHE_VERSION = 3
+
+def hashModifier(hasher, mod):
+    # Returns False if the result of the modifier can depend on other objects
+    if mod.type == "NODES":
+        return False
+    hashValue(hasher, mod.type)
+    for prop in mod.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type == "COLLECTION":
+            continue
+        value = getattr(mod, prop.identifier)
+        if prop.type == "POINTER":
+            # armatures deform the mesh, but never change its triangle count
+            if isinstance(value, bpy.types.Object) and mod.type != "ARMATURE":
+                return False
+            # the objects in a collection can change without changing its name
+            if isinstance(value, bpy.types.Collection):
+                return False
+            value = value.name if isinstance(value, bpy.types.ID) else None
+        elif isinstance(value, set):
+            value = sorted(value)
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(value)
+        hashValue(hasher, (prop.identifier, value))
+    return True
+
+def getHintsFingerprint(obj):
+    # None if the triangle count of the object can not be cached
+    if obj.type != "MESH" or obj.library is not None or obj.data.is_editmode:
+        return None
+    hasher = hashlib.sha1()
+    hashValue(hasher, HINTS_CACHE_VERSION)
+    hashValue(hasher, (len(obj.data.vertices), len(obj.data.polygons)))
+    hasher.update(bulkRead(obj.data.polygons, "loop_total", dtype = np.int32).tobytes())
+    # without modifiers the triangle count only depends on the topology, but e.g. decimate, weld, bevel and remesh
+    # produce a different number of triangles when vertices move
+    if any(mod.type != "ARMATURE" for mod in obj.modifiers):
+        hasher.update(bulkRead(obj.data.vertices, "co", 3).tobytes())
+    for mod in obj.modifiers:
+        if not hashModifier(hasher, mod):
+            return None
+    return hasher.hexdigest()
+
+def getCachedValue(obj, name, key, compute, deps = None):
+    # Value cached under the hints fingerprint of obj, key additionally has to match (e.g. for values depending on the vertex positions).
+    # compute gets the evaluated depsgraph, which is only requested if the value is not cached.
+    fingerprint = getHintsFingerprint(obj)
+    cache = obj.get(HINTS_CACHE_PROP) if fingerprint is not None else None
+    entry = cache.to_dict() if cache is not None and cache.get("fingerprint") == fingerprint else {"fingerprint": fingerprint}
+    if fingerprint is not None and name in entry and entry.get(name + "Key") == key:
+        return entry[name]
+    if deps is None:
+        deps = bpy.context.evaluated_depsgraph_get()
+    value = compute(deps)
+    # objects outside the depsgraph (other scenes, excluded or hidden collections) are evaluated without their modifiers
+    if fingerprint is not None and obj.evaluated_get(deps).is_evaluated:
+        entry[name] = value
+        entry[name + "Key"] = key
+        obj[HINTS_CACHE_PROP] = entry
+    return value
+
+def getCachedTris(obj, deps = None):
+    return getCachedValue(obj, "triangles", "", lambda deps: getTris(obj, deps), deps)
+
+def getBoundsKey(obj):
+    # the world bounds of a rotated object change when any vertex moves, the bounding box covers the armature deformation
+    hasher = hashlib.sha1()
+    hasher.update(bulkRead(obj.data.vertices, "co", 3).tobytes())
+    hasher.update(np.array(obj.bound_box, dtype = np.float64).tobytes())
+    hasher.update(np.array(obj.matrix_world, dtype = np.float64).tobytes())
+    return hasher.hexdigest()
+
+def getCachedBounds(obj, deps = None):
+    def compute(deps):
+        bounds = getEvaluatedBounds(obj, deps)
+        # ID properties can not store None
+        return [] if bounds is None else [*bounds[0], *bounds[1]]
+    if obj.type == "MESH":
+        bounds = getCachedValue(obj, "bounds", getBoundsKey(obj), compute, deps)
+    else:
+        bounds = compute(deps if deps is not None else bpy.context.evaluated_depsgraph_get())
+    return None if len(bounds) == 0 else (np.array(bounds[:3]), np.array(bounds[3:]))
+
+LOD_BOUNDS_TOLERANCE = 0.05
+LOD_ORIGIN_TOLERANCE = 0.001
+LOD_CHAIN_MAX_ITEMS = 10
+
+def getEvaluatedBounds(obj, deps):
+    # World space bounds of the evaluated geometry, None if it has no vertices
+    ev = obj.evaluated_get(deps)
+    mesh = ev.to_mesh()
+    try:
+        co = bulkRead(mesh.vertices, "co", 3).reshape(-1, 3)
+    finally:
+        ev.to_mesh_clear()
+    if len(co) == 0:
+        return None
+    matrix = np.array(ev.matrix_world)
+    co = co.astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+    return co.min(axis = 0), co.max(axis = 0)
+
+def checkLODChain(lods, deps = None):
+    # Compare bounds, origin and material slots of L1-L5 with L0, returns a list of problems
+    problems = []
+    bounds = [getCachedBounds(lod, deps) for lod in lods]
+    for i in [i for i, b in enumerate(bounds) if b is None]:
+        problems.append("L{} has no geometry".format(i))
+    if bounds[0] is not None:
+        valid = [i for i, b in enumerate(bounds) if b is not None and i > 0]
+        mins = np.array([bounds[i][0] for i in valid]).reshape(-1, 3)
+        maxs = np.array([bounds[i][1] for i in valid]).reshape(-1, 3)
+        deviation = np.maximum(np.abs(mins - bounds[0][0]), np.abs(maxs - bounds[0][1])).max(axis = 1)
+        tolerance = LOD_BOUNDS_TOLERANCE * (bounds[0][1] - bounds[0][0]).max()
+        for i, d in zip(valid, deviation):
+            if d > tolerance:
+                problems.append("L{} bounds differ from L0 by {:0.3f}m".format(i, d))
+    origins = np.array([lod.matrix_world.translation for lod in lods])
+    for i, d in enumerate(np.linalg.norm(origins - origins[0], axis = 1)):
+        if d > LOD_ORIGIN_TOLERANCE:
+            problems.append("L{} origin is {:0.3f}m away from the origin of L0".format(i, d))
+    materials = [[slot.material.name if slot.material else None for slot in lod.material_slots] for lod in lods]
+    for i in range(1, len(lods)):
+        if materials[i] != materials[0]:
+            problems.append("L{} materials ({}) differ from L0 ({})".format(i, ", ".join(str(m) for m in materials[i]), ", ".join(str(m) for m in materials[0])))
+    return problems
+
+def checkAllLODChains(deps = None):
+    # Check every complete LOD chain in the scene, returns a dict of item name to problems
+    lodObjects = {o.name: o for o in bpy.context.scene.objects if o.type in HINTS_SUPPORTED_TYPES and re.search("_L[0-5]$", o.name)}
+    results = {}
+    for item in sorted(dict.fromkeys(getItemName(name) for name in lodObjects)):
+        lods = [lodObjects.get("{}_L{}".format(item, i)) for i in range(0, 6)]
+        if None not in lods:
+            results[item] = checkLODChain(lods, deps)
+    return results
+
+class TMTK_OT_CheckLODChains(bpy.types.Operator):
+    bl_idname = "tmtk.tmtkchecklodchains"
+    bl_label = "TMTK: Check All LOD Chains"
+    bl_description = "Compare the LODs of every item in the scene with their L0 for matching bounds, origins and materials"
+
+    def execute(self, context):
+        start = time.perf_counter()
+        results = checkAllLODChains()
+        inconsistent = sorted(item for item, problems in results.items() if len(problems) > 0)
+        for item in inconsistent[:LOD_CHAIN_MAX_ITEMS]:
+            self.report({'WARNING'}, "{}: {}".format(item, "; ".join(results[item])))
+        more = " ({} not listed)".format(len(inconsistent) - LOD_CHAIN_MAX_ITEMS) if len(inconsistent) > LOD_CHAIN_MAX_ITEMS else ""
+        self.report({'INFO'}, "Checked LODs of {} items, {} inconsistent{} in {:.0f} ms.".format(
+            len(results), len(inconsistent), more, 1000.0 * (time.perf_counter() - start)))
+        return {'FINISHED'}
+
+class TMTK_OT_RecomputeHints(bpy.types.Operator):
+    bl_idname = "tmtk.tmtkrecomputehints"
+    bl_label = "TMTK: Recompute Hints Cache"
+    bl_description = "Discard the cached triangle counts and bounds of all objects in the view layer and compute them again"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        start = time.perf_counter()
+        peakBefore = getPeakMemory()
+        # objects outside the view layer are not evaluated, so they can not be cached
+        objects = [o for o in context.view_layer.objects if o.type == "MESH" and o.library is None]
+        deps = bpy.context.evaluated_depsgraph_get()
+        cached = 0
+        for obj in objects:
+            if HINTS_CACHE_PROP in obj:
+                del obj[HINTS_CACHE_PROP]
+            getCachedTris(obj, deps)
+            getCachedBounds(obj, deps)
+            cached += HINTS_CACHE_PROP in obj
+        self.report({'INFO'}, "Recomputed triangle counts and bounds of {} objects ({} cached) in {:.0f} ms.{}".format(
+            len(objects), cached, 1000.0 * (time.perf_counter() - start), getMemoryInfo(peakBefore)))
+        return {'FINISHED'}
+
 class TMTK_OT_Hints(bpy.types.Operator):
     bl_idname = "tmtk.tmtkhints"
     bl_label = "TMTK: Hints"
@@ -372,35 +2125,40 @@ class TMTK_OT_Hints(bpy.types.Operator):
 
     def prepare(self, context):
         active = context.active_object
-        self.meshname = re.sub("_L[0-5]$", "", active.name)
+        self.meshname = getItemName(active.name)
         self.lods = True
         self.lodTriCounts = []
         self.lodOrderError = -1
         self.type = active.type
 
         def getLod(name, i):
-            return bpy.data.objects.get("{}_L{}".format(name, i))
+            return context.view_layer.objects.get("{}_L{}".format(name, i))
 
+        # no depsgraph is passed, it is only evaluated for values which are not cached
+        lodObjects = [lod if lod is not None and lod.type in HINTS_SUPPORTED_TYPES else None for lod in (getLod(self.meshname, i) for i in range(0, 6))]
+        # only the chain of the active item, the whole scene is checked by TMTK_OT_CheckLODChains
+        self.lodChainProblems = checkLODChain(lodObjects) if None not in lodObjects else None
         if active.type in HINTS_SUPPORTED_TYPES:
-            deps = bpy.context.evaluated_depsgraph_get()
             for i in range(0,6):
                 lod = getLod(self.meshname, i)
                 if lod == None:
                     self.lods = False
                     break
                 else:
-                    self.lodTriCounts.append(getTris(lod, deps))
+                    self.lodTriCounts.append(getCachedTris(lod))
             if (self.lods):
                 for i in range(0,5):
                     if (self.lodTriCounts[i + 1] > self.lodTriCounts[i]):
                         self.lodOrderError = i
-            self.triCount = getTris(active, deps)
+            self.triCount = getCachedTris(active)
         else:
             self.lods = len([lod for lod in (getLod(self.meshname, i) for i in range(0,6)) if lod is not None]) == 6
             self.triCount = None
         materialSlots = [slot for slot in active.material_slots if slot.material != None]
         self.hasMaterial = (len(materialSlots) > 0)
         self.materials = [slot.material.name for slot in materialSlots]
+        self.textureFolders = getTextureFolders()
+        self.textureResults = [r for mat in dict.fromkeys(self.materials) for r in validateMaterialTextures(mat, self.textureFolders)]
         self.hasAnimation = (active.find_armature() != None)
         self.hasArmatureModifier = len([mod for mod in active.modifiers if mod.type == "ARMATURE"])
 
@@ -422,6 +2180,8 @@ class TMTK_OT_Hints(bpy.types.Operator):
 
     def draw(self, context):
         layout = self.layout
+        iconsAvailable = getAvailableIcons()
+        OKICON, NOTOKICON = getHintIcons()
 
         def addText(box, text, isokay: bool = None, icon: str = None):
             kwargs = {"text": text, "translate": False}
@@ -429,7 +2189,7 @@ class TMTK_OT_Hints(bpy.types.Operator):
                 kwargs["icon"] = NOTOKICON if not isokay else OKICON
             if icon is not None:
                 kwargs["icon"] = icon
-            if "icon" in kwargs and kwargs["icon"] not in ICONS_AVAILABLE:
+            if "icon" in kwargs and kwargs["icon"] not in iconsAvailable:
                 del kwargs["icon"]
             box.row().label(**kwargs)
 
@@ -446,6 +2206,14 @@ class TMTK_OT_Hints(bpy.types.Operator):
         else:
             addText(box, "- You should add LODs named {} to {}".format(self.meshname + "_L0", self.meshname + "_L5"))
 
+        box = layout.box()
+        if self.lodChainProblems is not None:
+            consistent = len(self.lodChainProblems) == 0
+            addText(box, "LODs match L0 in bounds, origin and materials: {}".format(consistent), isokay=consistent)
+            for problem in self.lodChainProblems:
+                addText(box, "- {}".format(problem))
+        box.operator(TMTK_OT_CheckLODChains.bl_idname, text = "Check all LOD chains")
+
         box = layout.box()
         addText(box, "Object has assigned material: {}".format(self.hasMaterial), isokay=self.hasMaterial)
         if not (self.hasMaterial):
@@ -453,6 +2221,13 @@ class TMTK_OT_Hints(bpy.types.Operator):
         else:
             nameSuggestions = ", ".join([mat + "_BC.png" + ", " + mat + "_NM.png" for mat in self.materials])
             addText(box, "- Your texture files should be named {} etc.".format(nameSuggestions))
+            if len(self.textureFolders) == 0:
+                addText(box, "- Save the .blend file or set a texture folder in the addon preferences to check your texture files.")
+            for name, path, problems in self.textureResults:
+                if path is None:
+                    addText(box, "{}: not found in {}".format(name, ", ".join(self.textureFolders)), isokay=False)
+                else:
+                    addText(box, "{}: {}{}".format(name, os.path.basename(path), "" if len(problems) == 0 else " " + ", ".join(problems)), isokay=len(problems) == 0)
 
         box = layout.box()
         transformsapplied = not self.unappliedTransforms
@@ -509,16 +2284,21 @@ class TMTK_MT_TMTKMenu(bpy.types.Menu):
         layout.operator(TMTK_OT_LODGenerator.bl_idname)
         layout.operator(TMTK_OT_Exporter.bl_idname)
         layout.operator(TMTK_OT_Hints.bl_idname)
+        layout.operator(TMTK_OT_CheckLODChains.bl_idname)
+        layout.operator(TMTK_OT_RecomputeHints.bl_idname)
         layout.operator(TMTK_OT_NormalizeWeights.bl_idname)
 
 def menu_func(self, context):
     self.layout.menu(TMTK_MT_TMTKMenu.bl_idname)
 
 def register():
+    bpy.utils.register_class(TMTKToolsPreferences)
     bpy.utils.register_class(TMTK_OT_AnimationFixer)
     bpy.utils.register_class(TMTK_OT_LODGenerator)
     bpy.utils.register_class(TMTK_OT_Exporter)
     bpy.utils.register_class(TMTK_OT_Hints)
+    bpy.utils.register_class(TMTK_OT_CheckLODChains)
+    bpy.utils.register_class(TMTK_OT_RecomputeHints)
     bpy.utils.register_class(TMTK_OT_NormalizeWeights)
     bpy.utils.register_class(TMTK_MT_TMTKMenu)
     bpy.types.VIEW3D_MT_object.append(menu_func)
@@ -528,9 +2308,18 @@ def unregister():
     bpy.utils.unregister_class(TMTK_OT_LODGenerator)
     bpy.utils.unregister_class(TMTK_OT_Exporter)
     bpy.utils.unregister_class(TMTK_OT_Hints)
+    bpy.utils.unregister_class(TMTK_OT_CheckLODChains)
+    bpy.utils.unregister_class(TMTK_OT_RecomputeHints)
     bpy.utils.unregister_class(TMTK_OT_NormalizeWeights)
     bpy.utils.unregister_class(TMTK_MT_TMTKMenu)
     bpy.types.VIEW3D_MT_object.remove(menu_func)
+    bpy.utils.unregister_class(TMTKToolsPreferences)
 
 if __name__ == "__main__":
-    register()
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if EXPORT_JOB_ARG in argv:
+        if EXPORT_SNAPSHOT_ARG in argv:
+            bpy.ops.wm.open_mainfile(filepath = argv[argv.index(EXPORT_SNAPSHOT_ARG) + 1])
+        runExportJob(argv[argv.index(EXPORT_JOB_ARG) + 1])
+    else:
+        register()